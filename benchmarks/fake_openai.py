@@ -0,0 +1,183 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint
+
+Answers POST /v1/chat/completions with the stub parser's result for the
+instruction in the last user message (or for each instruction of a JSON
+array), after a configurable latency, and fails a configurable fraction of
+requests with HTTP 500. Requests with tools get the result as a function
+call, and stream=true requests get it as server-sent events spread over the
+latency, followed by a usage chunk when stream_options asks for one. Token
+counts are estimated at four characters per token.
+
+Usage: python benchmarks/fake_openai.py --port 8801 --latency-ms 300 --error-rate 0.02
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_parser import parse_with_stub
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+
+        if not self.path.endswith("/chat/completions"):
+            return self._reply(404, {"error": {"message": "not found"}})
+
+        latency = max(0.0, random.gauss(server.latency, server.jitter))
+        request = json.loads(body or b"{}")
+        streaming = request.get("stream", False)
+        # Streamed replies spend half the latency before the first token
+        time.sleep(latency / 2 if streaming else latency)
+        server.count("requests")
+
+        if random.random() < server.error_rate:
+            server.count("errors")
+            return self._reply(500, {"error": {"message": "injected error", "type": "server_error"}})
+
+        raw_text = next(
+            (m.get("content", "") for m in reversed(request.get("messages", [])) if m.get("role") == "user"),
+            ""
+        )
+        try:
+            batch = json.loads(raw_text)
+        except ValueError:
+            batch = None
+        if isinstance(batch, list):
+            result = [parse_with_stub(text) for text in batch]
+        else:
+            result = parse_with_stub(raw_text)
+        prompt_tokens = sum(len(m.get("content") or "") for m in request.get("messages", [])) // 4
+        tools = request.get("tools")
+        if tools:
+            # Only the fields the function asks for, in schema order
+            properties = tools[0]["function"]["parameters"]["properties"]
+            result = {field: result[field] for field in properties if field in result}
+        if streaming:
+            return self._stream(request, result, bool(tools), latency / 2, prompt_tokens)
+
+        message = {"role": "assistant", "content": json.dumps(result)}
+        if tools:
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_fake_{server.counters['requests']}",
+                "type": "function",
+                "function": {"name": tools[0]["function"]["name"], "arguments": json.dumps(result)},
+            }]}
+
+        self._reply(200, {
+            "id": f"chatcmpl-fake-{server.counters['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tools else "stop",
+            }],
+            "usage": _usage(prompt_tokens, result),
+        })
+
+    def _stream(self, request, result, tools, duration, prompt_tokens, piece_size=8):
+        text = json.dumps(result)
+        pieces = [text[i:i + piece_size] for i in range(0, len(text), piece_size)]
+        base = {
+            "id": f"chatcmpl-fake-{self.server.counters['requests']}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+        }
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, piece in enumerate(pieces):
+            if tools:
+                call = {"index": 0, "function": {"arguments": piece}}
+                if i == 0:
+                    call.update(id="call_fake", type="function")
+                    call["function"]["name"] = "record_task"
+                delta = {"tool_calls": [call]}
+            else:
+                delta = {"content": piece}
+            self._event(dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}]))
+            time.sleep(duration / len(pieces))
+        finish = "tool_calls" if tools else "stop"
+        self._event(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": finish}]))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            self._event(dict(base, choices=[], usage=_usage(prompt_tokens, result)))
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(b"")
+
+    def _event(self, payload):
+        self._chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def _usage(prompt_tokens, result):
+    completion_tokens = len(json.dumps(result)) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=300, jitter_ms=50, error_rate=0.0):
+        super().__init__(("127.0.0.1", port), FakeOpenAIHandler)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.counters = {"requests": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8801)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"🧪 Fake OpenAI listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
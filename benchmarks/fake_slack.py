@@ -0,0 +1,201 @@
+"""
+Local stand-in for the Slack Web API
+
+Serves auth.test, paginated users.list, chat.postMessage,
+conversations.history (recent posted messages with their metadata) and
+conversations.replies (the replies in one of their threads). Each method has
+a requests-per-second budget; calls beyond it get HTTP 429 with Retry-After,
+like Slack's tiered rate limits.
+
+Usage: python benchmarks/fake_slack.py --port 8802 --members 20000
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Names used by benchmarks/corpus.txt, placed at the end of the member list
+# so lookups have to walk every page
+KNOWN_MEMBERS = ["Sarah Connor", "Alex King", "John Smith", "Priya Patel", "Maria Garcia", "Wei Chen"]
+
+# Requests per second allowed per method before answering 429
+DEFAULT_RATE_LIMITS = {"users.list": 20, "chat.postMessage": 50}
+
+class FakeSlackHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._handle(parse_qs(urlparse(self.path).query))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            params = json.loads(body or "{}")
+        else:
+            params = parse_qs(body)
+        params.update(parse_qs(urlparse(self.path).query))
+        self._handle(params)
+
+    def _handle(self, params):
+        params = {k: v[0] if isinstance(v, list) else v for k, v in params.items()}
+        method = urlparse(self.path).path.rsplit("/", 1)[-1]
+        server = self.server
+        server.count(method)
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if not server.allow(method):
+            server.count("ratelimited")
+            return self._reply(429, {"ok": False, "error": "ratelimited"}, {"Retry-After": "1"})
+
+        if method == "auth.test":
+            return self._reply(200, {"ok": True, "team": "Bench", "user": "taskpilot", "bot_id": "B0BENCH",
+                                     "user_id": "U0BOT", "team_id": "T0BENCH"},
+                               {"x-oauth-scopes": "chat:write,users:read"})
+        if method == "users.list":
+            limit = int(params.get("limit") or 200)
+            start = int(params.get("cursor") or 0)
+            page = server.members[start:start + limit]
+            next_cursor = str(start + limit) if start + limit < len(server.members) else ""
+            return self._reply(200, {"ok": True, "members": page, "response_metadata": {"next_cursor": next_cursor}})
+        if method == "chat.postMessage":
+            ts = f"{time.time():.6f}"
+            message = {"text": params.get("text"), "ts": ts}
+            if params.get("metadata"):
+                message["metadata"] = params["metadata"]
+            if params.get("thread_ts"):
+                message["thread_ts"] = params["thread_ts"]
+            server.post(params.get("channel"), message)
+            return self._reply(200, {"ok": True, "channel": params.get("channel"), "ts": ts, "message": message})
+        if method == "conversations.history":
+            oldest = float(params.get("oldest") or 0)
+            latest = float(params.get("latest") or "inf")
+            messages = [m for m in server.history(params.get("channel"))
+                        if oldest <= float(m["ts"]) <= latest and m.get("thread_ts", m["ts"]) == m["ts"]]
+            return self._reply(200, self._page(messages, params))
+        if method == "conversations.replies":
+            ts = params.get("ts")
+            messages = [m for m in reversed(server.history(params.get("channel")))
+                        if m["ts"] == ts or m.get("thread_ts") == ts]
+            return self._reply(200, self._page(messages, params))
+
+        self._reply(200, {"ok": False, "error": "unknown_method"})
+
+    def _page(self, messages, params):
+        limit = int(params.get("limit") or 100)
+        start = int(params.get("cursor") or 0)
+        next_cursor = str(start + limit) if start + limit < len(messages) else ""
+        return {"ok": True, "messages": messages[start:start + limit], "response_metadata": {"next_cursor": next_cursor}}
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeSlackServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, members=1000, latency_ms=20, rate_limits=None):
+        super().__init__(("127.0.0.1", port), FakeSlackHandler)
+        self.latency = latency_ms / 1000
+        self.members = build_members(members)
+        # Requests per second per method; methods not listed are unlimited
+        self.rate_limits = rate_limits if rate_limits is not None else dict(DEFAULT_RATE_LIMITS)
+        self.counters = {}
+        self._messages = {}  # channel -> recent messages, newest first
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/"
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def post(self, channel, message):
+        with self._lock:
+            messages = self._messages.setdefault(channel, [])
+            messages.insert(0, message)
+            del messages[1000:]
+
+    def history(self, channel):
+        with self._lock:
+            return list(self._messages.get(channel, ()))
+
+    def allow(self, method):
+        limit = self.rate_limits.get(method)
+        if not limit:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            # Fixed one-second window per method
+            window_start, used = self._windows.get(method, (now, 0))
+            if now - window_start >= 1:
+                window_start, used = now, 0
+            if used >= limit:
+                return False
+            self._windows[method] = (window_start, used + 1)
+            return True
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def build_members(count):
+    members = []
+    for i in range(max(0, count - len(KNOWN_MEMBERS))):
+        members.append({
+            "id": f"U{i:08d}",
+            "name": f"member{i}",
+            "is_bot": False,
+            "deleted": False,
+            "profile": {"display_name": f"member{i}", "real_name": f"Member {i}"},
+        })
+    for i, real_name in enumerate(KNOWN_MEMBERS):
+        members.append({
+            "id": f"UK{i:07d}",
+            "name": real_name.split()[0].lower(),
+            "is_bot": False,
+            "deleted": False,
+            "profile": {"display_name": "", "real_name": real_name},
+        })
+    return members
+
+def parse_rate_limits(overrides):
+    rate_limits = dict(DEFAULT_RATE_LIMITS)
+    for override in overrides:
+        method, _, rps = override.partition("=")
+        rate_limits[method] = float(rps)
+    return rate_limits
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8802)
+    parser.add_argument("--members", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--rate-limit", action="append", default=[], metavar="METHOD=RPS",
+                        help="override a per-method rate limit (0 = unlimited)")
+    args = parser.parse_args()
+
+    server = FakeSlackServer(args.port, args.members, args.latency_ms, parse_rate_limits(args.rate_limit))
+    print(f"🧪 Fake Slack listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Cold-start benchmark for TaskPilot AI
+
+Measures, in fresh interpreters, how long `import main` takes (from
+python -X importtime) and how long one task takes end to end with no
+credentials configured, and lists the heaviest imports. With --compare,
+the same measurements are taken for another git revision, exported to a
+temporary directory, to show the difference.
+
+Usage: python benchmarks/import_time.py --runs 10 --compare HEAD~1 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+TASK = "Remind Sarah to send the draft tomorrow\n"
+
+def clean_env():
+    # No credentials, so nothing waits on the network
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("OPENAI_", "SLACK_", "TASKPILOT_"))}
+    env.pop("PYTHONPATH", None)
+    env["TASKPILOT_PARSE_CACHE_PATH"] = ""
+    return env
+
+def import_profile(tree, env):
+    """
+    Return ({module: cumulative µs}, import main µs) for one interpreter
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=tree, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed in {tree}:\n{result.stderr[-2000:]}")
+    # Children are listed before their parent, so collect top-level
+    # children until the parent line says whose they were
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == "main":
+                return children, int(cumulative)
+            children = {}
+    raise RuntimeError("import main not found in -X importtime output")
+
+def run_once(tree, env):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "main.py", "--skip-preflight"],
+        cwd=tree, env=env, input=TASK, capture_output=True, text=True
+    )
+    return time.perf_counter() - start
+
+def measure(tree, runs):
+    env = clean_env()
+    # Warm up: compile bytecode and fill the OS file cache
+    import_profile(tree, env)
+    run_once(tree, env)
+
+    imports, totals, wall = {}, [], []
+    for _ in range(runs):
+        direct, total = import_profile(tree, env)
+        totals.append(total)
+        for name, micros in direct.items():
+            imports.setdefault(name, []).append(micros)
+        wall.append(run_once(tree, env))
+
+    heaviest = sorted(((statistics.median(v), k) for k, v in imports.items()), reverse=True)[:10]
+    return {
+        "import_main_ms": round(statistics.median(totals) / 1000, 2),
+        "run_one_task_ms": round(statistics.median(wall) * 1000, 1),
+        "heaviest_imports_ms": {name: round(micros / 1000, 2) for micros, name in heaviest},
+    }
+
+def export_revision(rev, directory):
+    archive = subprocess.run(["git", "archive", rev], cwd=REPO_DIR, capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", directory], input=archive.stdout, check=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--compare", metavar="REV", help="also measure this git revision")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {"runs": args.runs, "python": sys.version.split()[0], "current": measure(REPO_DIR, args.runs)}
+    if args.compare:
+        with tempfile.TemporaryDirectory() as directory:
+            export_revision(args.compare, directory)
+            report[args.compare] = measure(directory, args.runs)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Offline end-to-end benchmark for the TaskPilot AI pipeline
+
+Starts the fake OpenAI and Slack servers as subprocesses, points the app at
+them, replays a corpus of task sentences through parse_task -> send_to_slack
+(user lookup, rate-limit scheduler, outbound journal, task store) and reports
+per-stage p50/p95/p99 latency, tasks/sec and the memory high-water mark as
+JSON. The journal and task store live in a temporary directory; the app's own
+output goes to stderr.
+
+Usage: python benchmarks/run_benchmark.py --tasks 500 --concurrency 8 --output bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+STAGES = ("parse_task", "find_user_by_name", "send_to_slack", "total")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(script, port, extra_args):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, script), "--port", str(port)] + extra_args,
+        stdout=subprocess.DEVNULL
+    )
+    # Wait for the server to accept connections
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"{script} did not start")
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(samples):
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(values[-1] if values else None),
+    }
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+def max_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=os.path.join(BENCH_DIR, "corpus.txt"))
+    parser.add_argument("--tasks", type=int, default=200, help="tasks to replay (corpus is cycled)")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--members", type=int, default=1000, help="workspace size served by users.list")
+    parser.add_argument("--openai-latency-ms", type=float, default=300)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--slack-latency-ms", type=float, default=20)
+    parser.add_argument("--slack-rate-limit", action="append", default=[], metavar="METHOD=RPS")
+    parser.add_argument("--cache", action="store_true", help="leave the parse cache enabled")
+    parser.add_argument("--tiering", choices=("off", "full", "fields"), default="full",
+                        help="when the local parser's result is used instead of OpenAI")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    with open(args.corpus) as f:
+        corpus = [line.strip() for line in f if line.strip()]
+
+    openai_port, slack_port = free_port(), free_port()
+    servers = [
+        start_server("fake_openai.py", openai_port, [
+            "--latency-ms", str(args.openai_latency_ms), "--error-rate", str(args.openai_error_rate)
+        ]),
+        start_server("fake_slack.py", slack_port, [
+            "--members", str(args.members), "--latency-ms", str(args.slack_latency_ms)
+        ] + [a for limit in args.slack_rate_limit for a in ("--rate-limit", limit)]),
+    ]
+
+    state_dir = tempfile.TemporaryDirectory(prefix="taskpilot-bench-")
+    # Point the app at the fakes before its modules read the environment
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-benchmark-key",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "SLACK_API_URL": f"http://127.0.0.1:{slack_port}/api/",
+        "SLACK_BOT_TOKEN": "xoxb-benchmark",
+        "SLACK_APP_TOKEN": "xapp-benchmark",
+        # Match the scheduler's users.list budget to the fake server's default
+        "SLACK_METHOD_RATES": "users.list=1200",
+        "TASKPILOT_PARSE_TIERING": args.tiering,
+        # One message per task; a fresh journal, task store and user snapshot per run
+        "TASKPILOT_DIGEST": "off",
+        "TASKPILOT_OUTBOX_PATH": os.path.join(state_dir.name, "outbox.sqlite3"),
+        "TASKPILOT_TASK_STORE_PATH": os.path.join(state_dir.name, "tasks.sqlite3"),
+        "TASKPILOT_USER_DIRECTORY_PATH": os.path.join(state_dir.name, "users.sqlite3"),
+    })
+    if not args.cache:
+        os.environ.update({"TASKPILOT_PARSE_CACHE_SIZE": "0", "TASKPILOT_PARSE_CACHE_PATH": ""})
+
+    import slack_interface
+    from llm_parser import parse_task
+    from outbound_journal import get_outbound_journal
+
+    samples = {stage: [] for stage in STAGES}
+    lookups = threading.local()
+
+    # Time the user lookup inside send_to_slack, which calls it by module name
+    find_user_by_name = slack_interface.find_user_by_name
+    def timed_lookup(client, name):
+        start = time.perf_counter()
+        try:
+            return find_user_by_name(client, name)
+        finally:
+            lookups.seconds = time.perf_counter() - start
+    slack_interface.find_user_by_name = timed_lookup
+
+    def run_task(raw_text):
+        start = time.perf_counter()
+        parsed = parse_task(raw_text)
+        parsed_at = time.perf_counter()
+        lookups.seconds = 0.0
+        slack_interface.send_to_slack(parsed)
+        sent_at = time.perf_counter()
+        return start, parsed_at, lookups.seconds, sent_at
+
+    tasks = [corpus[i % len(corpus)] for i in range(args.tasks)]
+    try:
+        began = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            for start, parsed_at, lookup, sent_at in executor.map(run_task, tasks):
+                samples["parse_task"].append(parsed_at - start)
+                samples["find_user_by_name"].append(lookup)
+                samples["send_to_slack"].append(sent_at - parsed_at)
+                samples["total"].append(sent_at - start)
+        elapsed = time.perf_counter() - began
+        # Tasks Slack didn't take stay pending (or failed) in the journal
+        outbox = get_outbound_journal().counts()
+    finally:
+        for server in servers:
+            server.terminate()
+        state_dir.cleanup()
+
+    report = {
+        "config": vars(args),
+        "tasks": len(tasks),
+        "elapsed_s": round(elapsed, 3),
+        "tasks_per_sec": round(len(tasks) / elapsed, 2),
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+        "outbox": outbox,
+        "max_rss_kb": max_rss_kb(),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
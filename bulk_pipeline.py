@@ -0,0 +1,145 @@
+import os
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import redirect_stdout
+from llm_parser import parse_task
+from slack_interface import flush_digests, prefetch_recipient, send_to_slack
+
+BULK_PARSE_WORKERS = int(os.getenv('TASKPILOT_BULK_PARSE_WORKERS', '4'))
+BULK_BUFFER_SIZE = int(os.getenv('TASKPILOT_BULK_BUFFER', '100'))
+
+_DONE = object()
+
+def read_tasks(stream):
+    """
+    Yield a result record per input line; lines may be plain text or JSON
+    objects with a "text" (or "task") field and an optional "id"
+    """
+    for index, line in enumerate(stream):
+        line = line.strip()
+        if not line:
+            continue
+        record = {"index": index, "input": line}
+        if line.startswith("{"):
+            try:
+                item = json.loads(line)
+                record["input"] = item.get("text") or item.get("task") or ""
+                if "id" in item:
+                    record["id"] = item["id"]
+            except (ValueError, AttributeError) as e:
+                record["error"] = f"invalid JSON: {e}"
+        yield record
+
+def parse_stage(records, workers=BULK_PARSE_WORKERS):
+    """
+    Parse records with up to workers parses in flight, keeping input order
+    """
+    def parse(record):
+        if "error" in record or not record["input"]:
+            record.setdefault("error", "empty task")
+            return record
+        start = time.perf_counter()
+        try:
+            record["parsed"] = parse_task(record["input"], on_recipient=prefetch_recipient)
+        except Exception as e:
+            record["error"] = f"parse failed: {e}"
+        record["timing_ms"] = {"parse": round((time.perf_counter() - start) * 1000, 3)}
+        return record
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # A fixed window of futures bounds memory and preserves order
+        window = deque()
+        for record in records:
+            window.append(executor.submit(parse, record))
+            if len(window) >= workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+def send_stage(records, buffer_size=BULK_BUFFER_SIZE):
+    """
+    Send each parsed record to Slack and attach the message ts
+
+    In digest mode sends are queued, so records wait (in order) for their
+    digest to be posted; whatever is queued at the end is posted at once.
+    Once more than buffer_size records are waiting, the oldest is waited
+    for before more input is read, so memory stays bounded.
+    """
+    pending = deque()  # (record, start, result) in input order
+
+    def finish(record, start, result):
+        try:
+            ts = result.result() if isinstance(result, Future) else result
+            record["slack_ts"] = ts or None
+            if not ts:
+                record["error"] = "send failed (simulated)"
+        except Exception as e:
+            record["error"] = f"send failed: {e}"
+        record["timing_ms"]["send"] = round((time.perf_counter() - start) * 1000, 3)
+        return record
+
+    for record in records:
+        if "parsed" not in record:
+            pending.append((record, None, None))
+        else:
+            start = time.perf_counter()
+            try:
+                pending.append((record, start, send_to_slack(record["parsed"])))
+            except Exception as e:
+                record["error"] = f"send failed: {e}"
+                pending.append((record, None, None))
+        while pending and (len(pending) > buffer_size
+                           or not isinstance(pending[0][2], Future) or pending[0][2].done()):
+            record, start, result = pending.popleft()
+            yield finish(record, start, result) if start is not None else record
+
+    flush_digests()
+    while pending:
+        record, start, result = pending.popleft()
+        yield finish(record, start, result) if start is not None else record
+
+def buffered(records, size=BULK_BUFFER_SIZE):
+    """
+    Run a generator stage on its own thread behind a bounded queue so the
+    next stage overlaps with it
+    """
+    buffer = queue.Queue(maxsize=size)
+
+    def produce():
+        try:
+            for record in records:
+                buffer.put(record)
+        except BaseException as e:
+            buffer.put(e)
+        finally:
+            buffer.put(_DONE)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+def run_bulk(stream, output):
+    """
+    Stream tasks from stream through parse and send, writing one JSONL
+    result record per task to output. Returns (processed, failed).
+    """
+    processed = failed = 0
+    # Progress output goes to stderr so stdout stays valid JSONL
+    with redirect_stdout(sys.stderr):
+        pipeline = buffered(send_stage(buffered(parse_stage(read_tasks(stream)))))
+        for record in pipeline:
+            processed += 1
+            failed += "error" in record
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    return processed, failed
@@ -0,0 +1,115 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from metrics import inc
+
+BREAKER_WINDOW = float(os.getenv('TASKPILOT_BREAKER_WINDOW', '60'))  # seconds of outcomes considered
+BREAKER_MIN_CALLS = int(os.getenv('TASKPILOT_BREAKER_MIN_CALLS', '10'))
+BREAKER_ERROR_RATE = float(os.getenv('TASKPILOT_BREAKER_ERROR_RATE', '0.5'))
+BREAKER_P99 = float(os.getenv('TASKPILOT_BREAKER_P99', '10'))  # seconds, 0 = ignore latency
+BREAKER_COOLDOWN = float(os.getenv('TASKPILOT_BREAKER_COOLDOWN', '30'))
+BREAKER_PROBES = int(os.getenv('TASKPILOT_BREAKER_PROBES', '3'))
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing or degraded upstream
+
+    Outcomes over the last window seconds are kept; once there are at
+    least min_calls of them, an error rate of error_rate or a p99 latency
+    above p99 opens the breaker and allow() turns callers away. After
+    cooldown seconds it goes half-open and lets one trial call through at
+    a time: probes consecutive fast successes close it again, a failure
+    or slow trial reopens it.
+    """
+
+    def __init__(self, name, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS, error_rate=BREAKER_ERROR_RATE,
+                 p99=BREAKER_P99, cooldown=BREAKER_COOLDOWN, probes=BREAKER_PROBES):
+        self.name = name
+        self.window = window
+        self.min_calls = max(1, min_calls)
+        self.error_rate = error_rate
+        self.p99 = p99
+        self.cooldown = cooldown
+        self.probes = max(1, probes)
+        self.state = CLOSED
+        self._outcomes = deque()  # (time, ok, latency or None)
+        self._opened_at = 0.0
+        self._probing = False
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Return True if a call may go ahead; in half-open state the caller
+        is the trial and must record() its outcome
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self._set_state(HALF_OPEN)
+                self._probing = False
+                self._successes = 0
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, ok, latency=None):
+        """
+        Record the outcome of an allowed call; latency (seconds) is left
+        out for calls that aren't comparable, e.g. batches
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if ok and not self._slow(latency):
+                    self._successes += 1
+                    if self._successes >= self.probes:
+                        self._outcomes.clear()
+                        self._set_state(CLOSED)
+                else:
+                    self._trip(now, "trial call failed" if not ok else f"trial call took {latency:.1f}s")
+                return
+            if self.state == OPEN:
+                # Started before the breaker opened
+                return
+
+            self._outcomes.append((now, ok, latency))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            if len(self._outcomes) < self.min_calls:
+                return
+            errors = sum(1 for _, succeeded, _ in self._outcomes if not succeeded)
+            if errors / len(self._outcomes) >= self.error_rate:
+                self._trip(now, f"{errors}/{len(self._outcomes)} calls failed")
+                return
+            latencies = sorted(latency for _, _, latency in self._outcomes if latency is not None)
+            if self.p99 and len(latencies) >= self.min_calls:
+                p99 = latencies[math.ceil(0.99 * len(latencies)) - 1]
+                if p99 > self.p99:
+                    self._trip(now, f"p99 latency {p99:.1f}s")
+
+    def state_value(self):
+        return STATE_VALUES[self.state]
+
+    def _slow(self, latency):
+        return bool(self.p99 and latency is not None and latency > self.p99)
+
+    def _trip(self, now, reason):
+        self._opened_at = now
+        self._set_state(OPEN)
+        print(f"⚡ {self.name} circuit open ({reason}), retrying in {self.cooldown:.0f}s")
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            inc("taskpilot_breaker_transitions_total", breaker=self.name, state=state)
+            if state == CLOSED:
+                print(f"✅ {self.name} circuit closed")
@@ -0,0 +1,72 @@
+import os
+import threading
+
+# Shared client settings (override with environment variables)
+HTTP_POOL_SIZE = int(os.getenv('TASKPILOT_HTTP_POOL_SIZE', '10'))
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '30'))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+SLACK_TIMEOUT = int(os.getenv('SLACK_TIMEOUT', '30'))
+SLACK_API_URL = os.getenv('SLACK_API_URL', 'https://www.slack.com/api/')
+
+_lock = threading.Lock()
+_openai_clients = {}
+_slack_clients = {}
+_ssl_context = None
+
+def get_openai_client(api_key):
+    """
+    Return the process-wide OpenAI client for api_key
+
+    The client is created once with a keep-alive httpx connection pool so
+    every parse after the first reuses an open TLS connection.
+    """
+    with _lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            import httpx
+            import openai
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=HTTP_POOL_SIZE,
+                    max_keepalive_connections=HTTP_POOL_SIZE
+                ),
+                timeout=OPENAI_TIMEOUT
+            )
+            client = openai.OpenAI(
+                api_key=api_key,
+                timeout=OPENAI_TIMEOUT,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=http_client
+            )
+            _openai_clients[api_key] = client
+        return client
+
+def get_slack_client(bot_token):
+    """
+    Return the process-wide Slack WebClient for bot_token
+
+    WebClient is thread-safe, so the interactive path, the socket-mode
+    workers and the Socket Mode client itself all share one instance and
+    one SSL context instead of rebuilding them per call.
+    """
+    global _ssl_context
+    with _lock:
+        client = _slack_clients.get(bot_token)
+        if client is None:
+            import ssl
+            from slack_sdk import WebClient
+            if _ssl_context is None:
+                _ssl_context = ssl.create_default_context()
+            client = WebClient(token=bot_token, base_url=SLACK_API_URL, timeout=SLACK_TIMEOUT, ssl=_ssl_context)
+            _slack_clients[bot_token] = client
+        return client
+
+def close_clients():
+    """
+    Close pooled connections (call on shutdown)
+    """
+    with _lock:
+        for client in _openai_clients.values():
+            client.close()
+        _openai_clients.clear()
+        _slack_clients.clear()
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+
+# Digest mode: off (one message per task), blocks (one Block Kit message
+# per channel and window) or thread (a parent message with each task as a
+# threaded reply)
+DIGEST_MODE = os.getenv('TASKPILOT_DIGEST', 'off')
+DIGEST_WINDOW = float(os.getenv('TASKPILOT_DIGEST_WINDOW', '5'))  # seconds
+DIGEST_MAX_TASKS = int(os.getenv('TASKPILOT_DIGEST_MAX_TASKS', '20'))
+
+# Slack allows 50 blocks per message: one header, one context, one per task
+MAX_BLOCK_TASKS = 48
+
+# Message templates as bound str.format methods, filled in with one call
+# per message instead of being built line by line
+TASK_MESSAGE = (
+    "🤖 *TaskPilot AI Task*\n\n"
+    "*Recipient:* {mention}\n"
+    "*Task:* {task}\n"
+    "*Due Date:* {due_date}\n"
+    "*Response Required:* {response}\n"
+    "{extra}"
+).format
+OUTPUT_LINE = "*Output Format:* {}\n".format
+SUGGESTIONS_LINE = "*Did you mean:* {}\n".format
+DIGEST_TASK = "{mention} {task}\n_Due {due}_{response}".format
+DIGEST_RESPONSE = " · reply in thread with {}".format
+DIGEST_HEADER = "🤖 TaskPilot AI: {} new tasks".format
+DIGEST_FALLBACK = "🤖 TaskPilot AI: {} new tasks for {}".format
+
+def task_message(entry):
+    """
+    Text of the single-task message for a digest entry
+    """
+    parsed = entry['parsed']
+    response_required = parsed.get('response_required', False)
+    extra = OUTPUT_LINE(parsed.get('output', 'confirmation')) if response_required else ""
+    if entry.get('suggestions'):
+        extra += SUGGESTIONS_LINE(", ".join(entry['suggestions']))
+    return TASK_MESSAGE(
+        mention=entry['mention'],
+        task=parsed['task'],
+        due_date=parsed['due_date'],
+        response="Yes" if response_required else "No",
+        extra=extra,
+    )
+
+def digest_line(entry):
+    parsed = entry['parsed']
+    response = DIGEST_RESPONSE(parsed.get('output', 'confirmation')) if parsed.get('response_required') else ""
+    return DIGEST_TASK(
+        mention=entry['mention'],
+        task=parsed['task'],
+        due=parsed['due_date'][:16].replace("T", " "),
+        response=response,
+    )
+
+def digest_blocks(entries):
+    """
+    Block Kit blocks for a digest of entries, plus the fallback text used
+    for notifications
+    """
+    blocks = [
+        {"type": "header", "text": {"type": "plain_text", "text": DIGEST_HEADER(len(entries))}},
+        {"type": "context", "elements": [{"type": "mrkdwn", "text": "Reply in this thread when a task is done."}]},
+    ]
+    blocks.extend(
+        {"type": "section", "text": {"type": "mrkdwn", "text": digest_line(entry)}} for entry in entries
+    )
+    mentions = ", ".join(dict.fromkeys(entry['mention'] for entry in entries))
+    return blocks, DIGEST_FALLBACK(len(entries), mentions)
+
+class DigestBatcher:
+    """
+    Collects items per key (channel) and flushes them together
+
+    A batch is flushed window seconds after its first item or as soon as
+    it holds max_size items, on a background thread. add() returns a
+    Future resolved with what flush(key, items) returns for that batch,
+    or with its own element when flush returns a list, one per item.
+    """
+
+    def __init__(self, flush, window=DIGEST_WINDOW, max_size=DIGEST_MAX_TASKS):
+        self.flush = flush
+        self.window = window
+        self.max_size = max(1, max_size)
+        self._pending = {}  # key -> (flush at, [(item, future)])
+        self._ready = []
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def add(self, key, item):
+        # Imported on first use: concurrent.futures pulls in logging
+        from concurrent.futures import Future
+        future = Future()
+        with self._condition:
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = self._pending[key] = (time.monotonic() + self.window, [])
+            batch[1].append((item, future))
+            if len(batch[1]) >= self.max_size:
+                self._ready.append((key, self._pending.pop(key)[1]))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="taskpilot-digest", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def flush_all(self):
+        """
+        Flush every pending batch now, without waiting for its window
+        """
+        with self._condition:
+            batches = self._ready + [(key, batch[1]) for key, batch in self._pending.items()]
+            self._ready = []
+            self._pending = {}
+        for key, batch in batches:
+            self._flush(key, batch)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                now = time.monotonic()
+                for key, (flush_at, batch) in list(self._pending.items()):
+                    if flush_at <= now:
+                        self._ready.append((key, batch))
+                        del self._pending[key]
+                if not self._ready:
+                    wake_at = min((flush_at for flush_at, _ in self._pending.values()), default=now + 60)
+                    self._condition.wait(max(0.0, wake_at - now))
+                    continue
+                key, batch = self._ready.pop(0)
+            self._flush(key, batch)
+
+    def _flush(self, key, batch):
+        try:
+            result = self.flush(key, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        if not isinstance(result, list) or len(result) != len(batch):
+            result = [result] * len(batch)
+        for (_, future), item_result in zip(batch, result):
+            future.set_result(item_result)
@@ -0,0 +1,145 @@
+import heapq
+import os
+import threading
+import time
+from metrics import inc
+from task_store import FOLLOW_UP_DELAY
+
+SCHEDULER_HORIZON = int(os.getenv('TASKPILOT_SCHEDULER_HORIZON', '3600'))
+SCHEDULER_MAX_LOADED = int(os.getenv('TASKPILOT_SCHEDULER_MAX_LOADED', '50000'))
+SYNC_INTERVAL = 30  # seconds between checks for tasks added by other processes
+RETRY_DELAY = 60
+
+class DueScheduler:
+    """
+    Fires reminders and follow-ups when stored tasks come due
+
+    Only tasks due within the horizon are held, in a min-heap of
+    (next_at, id) read from the store's next_at index by keyset paging;
+    the next window is loaded as time advances, so hundreds of thousands
+    of pending tasks cost neither memory nor full-table polls. Tasks added
+    in this process are pushed directly and tasks added by other processes
+    are picked up by id every SYNC_INTERVAL. Each firing claims its task in
+    the store first, so several processes can share one store.
+    """
+
+    def __init__(self, store, fire, horizon=SCHEDULER_HORIZON, max_loaded=SCHEDULER_MAX_LOADED):
+        self.store = store
+        self.fire = fire
+        self.horizon = horizon
+        self.max_loaded = max_loaded
+        self._heap = []
+        self._cursor = (float("-inf"), 0)  # last (next_at, id) read from the store
+        self._loaded_until = float("-inf")  # every task due by then has been read
+        self._last_id = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        self._last_id = self.store.max_id()
+        self._thread = threading.Thread(target=self._run, name="taskpilot-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def schedule(self, task_id, next_at):
+        """
+        Tell the scheduler about a task stored or rescheduled in this process
+        """
+        with self._condition:
+            # Later tasks are read with their window
+            if next_at <= self._loaded_until:
+                heapq.heappush(self._heap, (next_at, task_id))
+                self._condition.notify()
+
+    def pending(self):
+        return len(self._heap)
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        next_sync = 0.0
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                now = time.time()
+                try:
+                    if now >= next_sync:
+                        self._sync()
+                        next_sync = now + SYNC_INTERVAL
+                    if self._loaded_until < now + self.horizon / 2:
+                        self._load(now + self.horizon)
+                except Exception as e:
+                    print(f"⚠️  Scheduler could not read the task store: {e}")
+                if not self._heap or self._heap[0][0] > now:
+                    wake_at = min(next_sync, self._heap[0][0] if self._heap else next_sync)
+                    self._condition.wait(max(0.0, wake_at - now))
+                    continue
+                next_at, task_id = heapq.heappop(self._heap)
+            self._fire(task_id, next_at)
+
+    def _load(self, until):
+        room = self.max_loaded - len(self._heap)
+        if room <= 0:
+            return
+        rows = self.store.scheduled(self._cursor, until, room)
+        for row in rows:
+            heapq.heappush(self._heap, row)
+        if rows:
+            self._cursor = rows[-1]
+        # A full page means later tasks in the window are still unread
+        self._loaded_until = rows[-1][0] if len(rows) == room else until
+
+    def _sync(self):
+        rows, self._last_id = self.store.added_since(self._last_id, self._loaded_until)
+        for row in rows:
+            heapq.heappush(self._heap, row)
+
+    def _fire(self, task_id, next_at):
+        task = self.store.get(task_id)
+        # Completed, or already handled from a duplicate heap entry
+        if not task or task['next_at'] != next_at:
+            return
+
+        if task['status'] == 'pending':
+            kind = "reminder"
+            if task['response_required'] and FOLLOW_UP_DELAY:
+                status, following = 'awaiting_response', task['due_at'] + FOLLOW_UP_DELAY
+            else:
+                status, following = 'reminded', None
+        elif task['status'] == 'awaiting_response':
+            kind, status, following = "follow_up", 'followed_up', None
+        else:
+            return
+
+        if not self.store.claim(task_id, next_at, status, following):
+            return
+        try:
+            self.fire(task, kind)
+            inc("taskpilot_reminders_total", kind=kind)
+        except Exception as e:
+            print(f"⚠️  Could not send {kind} for task {task_id}: {e}")
+            inc("taskpilot_reminders_total", kind=kind, result="error")
+            following = time.time() + RETRY_DELAY
+            self.store.reschedule(task_id, task['status'], following)
+        if following:
+            self.schedule(task_id, following)
+
+_scheduler = None
+
+def set_due_scheduler(scheduler):
+    global _scheduler
+    _scheduler = scheduler
+
+def schedule_task(task_id, next_at):
+    """
+    Hand a newly stored task to this process's scheduler, if one is running
+    """
+    if _scheduler is not None:
+        _scheduler.schedule(task_id, next_at)
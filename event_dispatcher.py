@@ -0,0 +1,145 @@
+import os
+import queue
+import threading
+import zlib
+from metrics import inc
+
+BACKPRESSURE_POLICIES = ("shed", "busy", "block")
+BUSY_QUEUE_SIZE = 10  # busy replies waiting to be sent; more are dropped
+
+_STOP = object()
+
+class EventDispatcher:
+    """
+    Bounded worker pool that drains Socket Mode events off the listener thread
+
+    Events are sharded by channel onto per-worker queues, so events from the
+    same channel are handled in arrival order while different channels run
+    in parallel. When a worker queue is full the backpressure policy decides
+    what happens:
+    - shed: drop the event
+    - busy: drop the event and call on_busy(event) so the user can be told
+    - block: wait for room in the queue
+
+    Busy replies are sent from their own thread, at most one pending per
+    channel, so rate-limit waits never hold up the listener thread.
+    """
+
+    def __init__(self, handler, workers=None, queue_size=None, policy=None, on_busy=None):
+        self.handler = handler
+        self.workers = workers or int(os.getenv('TASKPILOT_WORKERS', '4'))
+        self.queue_size = queue_size or int(os.getenv('TASKPILOT_QUEUE_SIZE', '100'))
+        self.policy = policy or os.getenv('TASKPILOT_BACKPRESSURE', 'busy')
+        self.on_busy = on_busy
+
+        if self.policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {self.policy}")
+
+        # Split the total capacity across the per-worker queues
+        per_worker = max(1, self.queue_size // self.workers)
+        self._queues = [queue.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        self._threads = []
+        self.shed_count = 0
+        self._busy_queue = queue.Queue(maxsize=BUSY_QUEUE_SIZE)
+        self._busy_thread = None
+        self._busy_channels = set()
+        self._busy_lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the worker threads
+        """
+        for i, q in enumerate(self._queues):
+            thread = threading.Thread(target=self._run, args=(q,), name=f"taskpilot-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.policy == "busy" and self.on_busy:
+            self._busy_thread = threading.Thread(target=self._run_busy, name="taskpilot-busy", daemon=True)
+            self._busy_thread.start()
+        print(f"⚙️  Event dispatcher started: {self.workers} workers, queue size {self.queue_size}, policy '{self.policy}'")
+        return self
+
+    def submit(self, event):
+        """
+        Queue an event for processing. Returns False if it was not accepted.
+        """
+        q = self._queues[self._shard(event)]
+
+        if self.policy == "block":
+            q.put(event)
+            return True
+
+        try:
+            q.put_nowait(event)
+            return True
+        except queue.Full:
+            self.shed_count += 1
+            inc("taskpilot_events_shed_total", policy=self.policy)
+            print(f"⚠️  Event queue full, dropping event ({self.policy})")
+            if self.policy == "busy" and self.on_busy:
+                self._queue_busy(event)
+            return False
+
+    def queue_depth(self):
+        """
+        Number of events waiting across all worker queues
+        """
+        return sum(q.qsize() for q in self._queues)
+
+    def shutdown(self, drain=True):
+        """
+        Stop the workers, optionally after the queued events are processed
+        """
+        for q in self._queues:
+            if not drain:
+                # Discard pending events so the stop marker is next in line
+                while True:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        break
+            q.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._busy_thread:
+            self._busy_queue.put(_STOP)
+            self._busy_thread.join()
+            self._busy_thread = None
+
+    def _shard(self, event):
+        channel = event.get('channel') or ''
+        return zlib.crc32(channel.encode()) % self.workers
+
+    def _queue_busy(self, event):
+        channel = event.get('channel') or ''
+        with self._busy_lock:
+            if channel in self._busy_channels:
+                return
+            try:
+                self._busy_queue.put_nowait(event)
+            except queue.Full:
+                return
+            self._busy_channels.add(channel)
+
+    def _run_busy(self):
+        while True:
+            event = self._busy_queue.get()
+            if event is _STOP:
+                break
+            with self._busy_lock:
+                self._busy_channels.discard(event.get('channel') or '')
+            try:
+                self.on_busy(event)
+            except Exception as e:
+                print(f"❌ Error sending busy reply: {e}")
+
+    def _run(self, q):
+        while True:
+            event = q.get()
+            if event is _STOP:
+                break
+            try:
+                self.handler(event)
+            except Exception as e:
+                print(f"❌ Error processing event: {e}")
@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+DEDUPE_TTL = int(os.getenv('TASKPILOT_DEDUPE_TTL', '3600'))
+DEDUPE_MAX_KEYS = int(os.getenv('TASKPILOT_DEDUPE_MAX_KEYS', '100000'))
+DEDUPE_PATH = os.getenv('TASKPILOT_DEDUPE_PATH', '')
+DEDUPE_BUCKETS = 12
+
+class RotatingSetStore:
+    """
+    Fixed-memory dedupe set made of time buckets
+
+    Keys go into the newest bucket; buckets older than the TTL are dropped
+    whole. A full bucket starts a new one, and once the key budget is
+    exceeded the oldest bucket is dropped early, so memory stays bounded
+    under bursts.
+    """
+
+    def __init__(self, ttl=DEDUPE_TTL, max_keys=DEDUPE_MAX_KEYS, buckets=DEDUPE_BUCKETS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.bucket_span = ttl / buckets
+        self.bucket_capacity = max(1, max_keys // buckets)
+        self._buckets = deque()  # (start time, set of keys)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def check_and_add(self, key):
+        """
+        Record key and return True if it was already seen within the TTL
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            for _, keys in self._buckets:
+                if key in keys:
+                    return True
+            newest = self._buckets[-1] if self._buckets else None
+            if (not newest or now - newest[0] >= self.bucket_span
+                    or len(newest[1]) >= self.bucket_capacity):
+                self._buckets.append((now, set()))
+            self._buckets[-1][1].add(key)
+            self._size += 1
+            while self._size > self.max_keys and len(self._buckets) > 1:
+                self._size -= len(self._buckets.popleft()[1])
+            return False
+
+    def _expire(self, now):
+        while self._buckets and now - self._buckets[0][0] > self.ttl:
+            self._size -= len(self._buckets.popleft()[1])
+
+class SQLiteIdempotencyStore:
+    """
+    Dedupe store shared between processes and kept across restarts
+
+    INSERT OR IGNORE on the primary key makes check-and-add atomic across
+    every process using the same database file.
+    """
+
+    def __init__(self, path, ttl=DEDUPE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen_events (key TEXT PRIMARY KEY, seen REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS seen_events_seen ON seen_events (seen)")
+        self._inserts = 0
+
+    def check_and_add(self, key):
+        """
+        Record key and return True if it was already seen within the TTL
+        """
+        now = time.time()
+        with self._lock:
+            # Drop an expired entry for this key so it can be recorded again
+            self._db.execute("DELETE FROM seen_events WHERE key = ? AND seen < ?", (key, now - self.ttl))
+            cursor = self._db.execute("INSERT OR IGNORE INTO seen_events (key, seen) VALUES (?, ?)", (key, now))
+            if cursor.rowcount == 0:
+                return True
+            self._inserts += 1
+            if self._inserts % 1000 == 0:
+                self._db.execute("DELETE FROM seen_events WHERE seen < ?", (now - self.ttl,))
+            return False
+
+def event_keys(payload):
+    """
+    Idempotency keys for an Events API payload: the envelope's event_id and
+    the message's client_msg_id
+    """
+    event = payload.get("event", {})
+    keys = []
+    if payload.get("event_id"):
+        keys.append(f"event:{payload['event_id']}")
+    if event.get("client_msg_id"):
+        keys.append(f"msg:{event['client_msg_id']}")
+    return keys
+
+def is_duplicate(store, payload):
+    """
+    Record the payload's keys and return True if any was already seen
+    """
+    # Every key is recorded, so a later retry matches whichever it carries
+    results = [store.check_and_add(key) for key in event_keys(payload)]
+    return any(results)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_idempotency_store():
+    """
+    Return the process-wide dedupe store: SQLite when TASKPILOT_DEDUPE_PATH
+    is set, otherwise in-memory
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            if DEDUPE_PATH:
+                _store = SQLiteIdempotencyStore(DEDUPE_PATH)
+            else:
+                _store = RotatingSetStore()
+        return _store
@@ -0,0 +1,92 @@
+import json
+from json.decoder import scanstring
+
+_WHITESPACE = " \t\n\r"
+
+class IncrementalJSONObject:
+    """
+    Parser for a flat JSON object that arrives in fragments
+
+    feed() returns each (key, value) member as soon as its value is
+    complete, so callers can act on early fields while later ones are
+    still streaming in.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.started = False
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text):
+        """
+        Add text and return the members completed by it
+        """
+        self._buffer += text
+        completed = []
+        while not self.done:
+            member = self._next_member()
+            if member is None:
+                break
+            completed.append(member)
+        return completed
+
+    def result(self):
+        """
+        Return the parsed object, raising ValueError if it is incomplete
+        """
+        if not self.done:
+            raise ValueError(f"Incomplete JSON object: {self._buffer[:200]!r}")
+        return dict(self.values)
+
+    def _next_member(self):
+        buffer = self._buffer
+        i = self._skip(self._pos)
+        if i >= len(buffer):
+            return None
+        if not self.started:
+            if buffer[i] != "{":
+                raise ValueError(f"Expected a JSON object, got {buffer[i:i + 20]!r}")
+            self.started = True
+            self._pos = i + 1
+            return self._next_member()
+        if buffer[i] == "}":
+            self.done = True
+            self._pos = i + 1
+            return None
+        if buffer[i] == ",":
+            i = self._skip(i + 1)
+            if i >= len(buffer):
+                return None
+
+        # Anything that fails to decode here is incomplete, not invalid;
+        # result() reports it if the stream ends that way
+        try:
+            key, end = scanstring(buffer, i + 1)
+        except ValueError:
+            return None
+        i = self._skip(end)
+        if i >= len(buffer) or buffer[i] != ":":
+            return None
+        i = self._skip(i + 1)
+        try:
+            value, end = self._decoder.raw_decode(buffer, i)
+        except ValueError:
+            return None
+        # Numbers may continue in the next fragment ("12" -> "12.5")
+        if buffer[i] not in "\"{[":
+            following = self._skip(end)
+            if following >= len(buffer) or buffer[following] not in ",}":
+                return None
+
+        self.values[key] = value
+        self._pos = end
+        return key, value
+
+    def _skip(self, i):
+        buffer = self._buffer
+        while i < len(buffer) and buffer[i] in _WHITESPACE:
+            i += 1
+        return i
@@ -2,52 +2,184 @@ import os
 import json
 from datetime import datetime, timedelta
 import re
+import threading
+import time
+from clients import get_openai_client
+from incremental_json import IncrementalJSONObject
+from parse_cache import get_parse_cache, cache_key
+from metrics import inc, observe, register_gauge, timed
+from circuit_breaker import CircuitBreaker
+from prompts import FIELD_DESCRIPTIONS, batch_messages, task_messages, task_tool
+from llm_usage import record_usage
 
-def parse_task(raw_text):
+OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+
+# How parse_with_openai asks for the fields: text (JSON in the reply),
+# tools (a forced function call) or stream (a streamed function call whose
+# fields are reported as they complete)
+OPENAI_MODE = os.getenv('TASKPILOT_OPENAI_MODE', 'stream')
+OPENAI_DEADLINE = float(os.getenv('OPENAI_DEADLINE', '15'))  # seconds per parse, 0 = no deadline
+# Answer with the stub parse if OpenAI hasn't replied after this many
+# seconds (0 = always wait); the late reply still fills the parse cache
+PARSE_HEDGE_AFTER = float(os.getenv('TASKPILOT_PARSE_HEDGE', '0'))
+
+# Failing or slow OpenAI calls open the breaker and send tasks straight to
+# the stub parser until trial calls succeed again
+OPENAI_BREAKER = CircuitBreaker("OpenAI")
+register_gauge("taskpilot_openai_breaker_state", OPENAI_BREAKER.state_value)
+
+# Bulk parsing defaults (override with environment variables)
+PARSE_BATCH_SIZE = int(os.getenv('TASKPILOT_PARSE_BATCH_SIZE', '20'))
+PARSE_CONCURRENCY = int(os.getenv('TASKPILOT_PARSE_CONCURRENCY', '8'))
+PARSE_RATE_LIMIT = float(os.getenv('TASKPILOT_PARSE_RATE_LIMIT', '0'))  # requests/second, 0 = unlimited
+
+# Tiered parsing: the stub parser runs first and OpenAI is only called when
+# a field's confidence is below its threshold. Modes: off (always OpenAI),
+# full (re-parse the whole task) or fields (ask only for the weak fields)
+PARSE_TIERING = os.getenv('TASKPILOT_PARSE_TIERING', 'full')
+TIER_THRESHOLD = float(os.getenv('TASKPILOT_TIER_THRESHOLD', '0.7'))
+TIER_LOG_PATH = os.getenv('TASKPILOT_TIER_LOG', '')
+
+def tier_thresholds():
+    """
+    Per-field confidence thresholds: TASKPILOT_TIER_THRESHOLD with
+    TASKPILOT_TIER_THRESHOLDS overrides (e.g. "recipient=0.9,output=0.5")
+    """
+    thresholds = dict.fromkeys(FIELD_DESCRIPTIONS, TIER_THRESHOLD)
+    for override in filter(None, os.getenv('TASKPILOT_TIER_THRESHOLDS', '').split(',')):
+        field, _, threshold = override.partition('=')
+        thresholds[field.strip()] = float(threshold)
+    return thresholds
+
+TIER_THRESHOLDS = tier_thresholds()
+
+def parse_task(raw_text, on_recipient=None):
     """
     Parse natural language task using OpenAI API or fallback to stub
+
+    With tiering on, a confident stub parse is returned without calling
+    OpenAI. When streaming, on_recipient(name) is called as soon as the
+    recipient arrives, before the rest of the fields. While the OpenAI
+    breaker is open the stub parse is used without trying OpenAI.
     """
     try:
         # Try to use OpenAI API if available
         api_key = os.getenv('OPENAI_API_KEY')
         if api_key:
-            return parse_with_openai(raw_text, api_key)
+            stub, confidence, weak = None, None, list(FIELD_DESCRIPTIONS)
+            if PARSE_TIERING != "off":
+                stub, confidence = parse_with_stub_scored(raw_text)
+                weak = [field for field, score in confidence.items() if score < TIER_THRESHOLDS[field]]
+                if not weak:
+                    log_tier_decision(raw_text, "stub", confidence, weak)
+                    return stub
+
+            # Repeat instructions are served from the cache for the same day
+            cache = get_parse_cache()
+            key = cache_key(raw_text)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            if not OPENAI_BREAKER.allow():
+                print("[LLM] OpenAI circuit open, using stub parser")
+                inc("taskpilot_stub_fallbacks_total", reason="breaker_open")
+                return stub if stub is not None else parse_with_stub(raw_text)
+
+            def ask_openai():
+                start = time.monotonic()
+                try:
+                    if PARSE_TIERING == "fields":
+                        answers = parse_with_openai(raw_text, api_key, fields=weak, on_recipient=on_recipient)
+                        parsed = dict(stub, **{field: answers[field] for field in weak if field in answers})
+                        parsed = validate_and_clean_parsed_task(parsed, raw_text)
+                        log_tier_decision(raw_text, "llm_fields", confidence, weak, stub, parsed)
+                    else:
+                        parsed = parse_with_openai(raw_text, api_key, on_recipient=on_recipient)
+                        if stub is not None:
+                            log_tier_decision(raw_text, "llm", confidence, weak, stub, parsed)
+                except Exception:
+                    OPENAI_BREAKER.record(False, time.monotonic() - start)
+                    raise
+                OPENAI_BREAKER.record(True, time.monotonic() - start)
+                cache.put(key, parsed)
+                return parsed
+
+            if PARSE_HEDGE_AFTER:
+                return _hedged(ask_openai, stub, raw_text)
+            return ask_openai()
         else:
             print("[LLM] No OpenAI API key found, using stub parser")
+            inc("taskpilot_stub_fallbacks_total", reason="no_api_key")
             return parse_with_stub(raw_text)
     except Exception as e:
         print(f"[LLM] Error parsing with OpenAI: {e}")
         print("[LLM] Falling back to stub parser")
+        inc("taskpilot_stub_fallbacks_total", reason="openai_error")
         return parse_with_stub(raw_text)
 
-def parse_with_openai(raw_text, api_key):
+def _hedged(ask_openai, stub, raw_text):
+    """
+    Run ask_openai() in the background and return its result, or the stub
+    parse if it takes longer than PARSE_HEDGE_AFTER seconds
+    """
+    from concurrent.futures import Future, TimeoutError as FutureTimeout
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(ask_openai())
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="taskpilot-hedge", daemon=True).start()
+    try:
+        return future.result(timeout=PARSE_HEDGE_AFTER)
+    except FutureTimeout:
+        print(f"[LLM] OpenAI slower than {PARSE_HEDGE_AFTER}s, using stub parser")
+        inc("taskpilot_stub_fallbacks_total", reason="hedged")
+        return stub if stub is not None else parse_with_stub(raw_text)
+
+@timed("parse_with_openai")
+def parse_with_openai(raw_text, api_key, fields=None, on_recipient=None, mode=None):
     """
     Parse task using OpenAI API
+
+    With fields, only those fields are requested and returned unvalidated,
+    for merging into a stub parse. The whole call, retries included, must
+    finish within OPENAI_DEADLINE seconds.
     """
+    mode = mode or OPENAI_MODE
     try:
-        import openai
-        client = openai.OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
+        deadline = time.monotonic() + OPENAI_DEADLINE if OPENAI_DEADLINE else None
+        if deadline:
+            # One attempt bounded by the deadline rather than retries past it
+            client = client.with_options(timeout=OPENAI_DEADLINE, max_retries=0)
         
-        prompt = f"""
-        Extract the following fields from this task instruction:
-        - recipient: The person who should perform the task
-        - task: The actual task to be performed
-        - due_date: When the task should be done (in ISO format)
-        - response_required: Whether a response is needed (true/false)
-        - output: What output is expected (e.g., summary, confirmation, etc.)
-
-        Input: "{raw_text}"
-
-        Return only a valid JSON object with these fields.
-        """
+        # A fixed system prompt with the instruction as its own message; in
+        # text mode all fields come back and the caller picks what it asked for
+        request = {
+            "model": OPENAI_MODEL,
+            "messages": task_messages(raw_text, mode),
+            "temperature": 0.1,
+        }
+        if mode != "text":
+            request["tools"] = [task_tool(fields)]
+            request["tool_choice"] = {"type": "function", "function": {"name": "record_task"}}
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1
-        )
-        
-        result = json.loads(response.choices[0].message.content)
+        if mode == "stream":
+            result = _stream_tool_call(client, request, on_recipient, deadline)
+        else:
+            start = time.monotonic()
+            response = client.chat.completions.create(**request)
+            record_usage(OPENAI_MODEL, response.usage, time.monotonic() - start)
+            message = response.choices[0].message
+            if message.tool_calls:
+                result = json.loads(message.tool_calls[0].function.arguments)
+            else:
+                result = extract_json(message.content)
+        if fields:
+            return result
         
         # Validate and clean the result
         return validate_and_clean_parsed_task(result, raw_text)
@@ -55,67 +187,445 @@ def parse_with_openai(raw_text, api_key):
     except Exception as e:
         raise Exception(f"OpenAI API error: {e}")
 
-def parse_with_stub(raw_text):
+def _stream_tool_call(client, request, on_recipient, deadline):
+    """
+    Stream a forced function call, parsing its arguments as they arrive
+    """
+    start = time.monotonic()
+    stream = client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **request)
+    # Closing the response from a timer ends a stalled read at the deadline
+    watchdog = None
+    if deadline:
+        watchdog = threading.Timer(max(0.0, deadline - time.monotonic()), stream.response.close)
+        watchdog.daemon = True
+        watchdog.start()
+
+    arguments = IncrementalJSONObject()
+    content = []
+    usage, first_token = None, None
+    try:
+        for chunk in stream:
+            # Usage arrives in a last chunk without choices
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            if first_token is None:
+                first_token = time.monotonic() - start
+            delta = chunk.choices[0].delta
+            for tool_call in delta.tool_calls or ():
+                if tool_call.function and tool_call.function.arguments:
+                    for field, value in arguments.feed(tool_call.function.arguments):
+                        if field == "recipient" and on_recipient and value:
+                            on_recipient(value)
+            if delta.content:
+                content.append(delta.content)
+    except Exception:
+        if deadline and time.monotonic() >= deadline:
+            raise TimeoutError(f"no complete response within {OPENAI_DEADLINE}s")
+        raise
+    finally:
+        if watchdog:
+            watchdog.cancel()
+        stream.response.close()
+    record_usage(OPENAI_MODEL, usage, time.monotonic() - start, first_token)
+
+    if arguments.started:
+        if not arguments.done and deadline and time.monotonic() >= deadline:
+            raise TimeoutError(f"no complete response within {OPENAI_DEADLINE}s")
+        return arguments.result()
+    return extract_json("".join(content))
+
+def extract_json(content):
+    """
+    Parse the JSON value in a completion, ignoring prose or a code fence
+    around it
+    """
+    content = content.strip()
+    try:
+        return json.loads(content)
+    except ValueError:
+        pass
+    starts = [i for i in (content.find("{"), content.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError(f"No JSON found in response: {content[:200]!r}")
+    value, _ = json.JSONDecoder().raw_decode(content, min(starts))
+    return value
+
+def parse_tasks(raw_texts, strategy="concurrent", batch_size=None, concurrency=None, rate_limit=None):
+    """
+    Parse many task instructions, returning results in input order
+
+    Strategies:
+    - batch: pack batch_size instructions into one completion that returns a
+      JSON array; malformed entries fall back to the stub parser
+    - concurrent: run up to concurrency parse_task calls at once, starting at
+      most rate_limit requests per second
+    """
+    raw_texts = list(raw_texts)
+    batch_size = batch_size or PARSE_BATCH_SIZE
+    concurrency = concurrency or PARSE_CONCURRENCY
+    rate_limit = PARSE_RATE_LIMIT if rate_limit is None else rate_limit
+
+    if strategy not in ("batch", "concurrent"):
+        raise ValueError(f"Unknown parse strategy: {strategy}")
+
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        print("[LLM] No OpenAI API key found, using stub parser")
+        inc("taskpilot_stub_fallbacks_total", len(raw_texts), reason="no_api_key")
+        results = parse_with_stub_batch(raw_texts)
+    elif strategy == "batch":
+        # Confident stub parses are kept; only the rest go to OpenAI
+        results = [None] * len(raw_texts)
+        pending = list(range(len(raw_texts)))
+        if PARSE_TIERING != "off":
+            now = datetime.now()
+            pending = []
+            for i, text in enumerate(raw_texts):
+                stub, confidence = _stub_parse(text, now)
+                if all(score >= TIER_THRESHOLDS[field] for field, score in confidence.items()):
+                    results[i] = stub
+                else:
+                    pending.append(i)
+            inc("taskpilot_parse_tier_total", len(raw_texts) - len(pending), tier="stub")
+            inc("taskpilot_parse_tier_total", len(pending), tier="llm")
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        parsed_batches = _fan_out(
+            lambda batch: _parse_batch([raw_texts[i] for i in batch], api_key), batches, concurrency, rate_limit
+        )
+        for batch, parsed_batch in zip(batches, parsed_batches):
+            for i, parsed in zip(batch, parsed_batch):
+                results[i] = parsed
+    else:
+        results = _fan_out(parse_task, raw_texts, concurrency, rate_limit)
+
+    return [validate_and_clean_parsed_task(parsed, text) for parsed, text in zip(results, raw_texts)]
+
+def _fan_out(func, items, concurrency, rate_limit):
+    """
+    Map func over items on a thread pool, keeping input order
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    limiter = _RateLimiter(rate_limit)
+
+    def call(item):
+        limiter.wait()
+        return func(item)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return list(executor.map(call, items))
+
+class _RateLimiter:
+    """
+    Spaces request starts at least 1/rate seconds apart across threads
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+# Fields a batch entry must fill to be used; validation defaults the rest,
+# but would turn a missing recipient into "Unknown"
+BATCH_REQUIRED_FIELDS = ("recipient", "task")
+
+def _parse_batch(raw_texts, api_key):
+    """
+    Parse several instructions with a single completion, bounded by
+    OPENAI_DEADLINE like a single parse
+    """
+    if not OPENAI_BREAKER.allow():
+        print("[LLM] OpenAI circuit open, using stub parser for batch")
+        inc("taskpilot_stub_fallbacks_total", len(raw_texts), reason="breaker_open")
+        return [parse_with_stub(text) for text in raw_texts]
+    try:
+        client = get_openai_client(api_key)
+        if OPENAI_DEADLINE:
+            # One attempt bounded by the deadline rather than retries past it
+            client = client.with_options(timeout=OPENAI_DEADLINE, max_retries=0)
+        start = time.monotonic()
+        response = client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=batch_messages(raw_texts),
+            temperature=0.1
+        )
+        record_usage(OPENAI_MODEL, response.usage, time.monotonic() - start, tasks=len(raw_texts))
+        
+        items = extract_json(response.choices[0].message.content)
+        if isinstance(items, dict):
+            # Tolerate {"tasks": [...]} style wrappers
+            items = next((v for v in items.values() if isinstance(v, list)), [])
+        # Batch latency grows with its size, so only the outcome counts; a
+        # call past the deadline raised and counts as a failure
+        OPENAI_BREAKER.record(True)
+    except Exception as e:
+        OPENAI_BREAKER.record(False)
+        print(f"[LLM] Error parsing batch with OpenAI: {e}")
+        print("[LLM] Falling back to stub parser")
+        items = []
+
+    results = []
+    for i, text in enumerate(raw_texts):
+        item = items[i] if i < len(items) else None
+        if isinstance(item, dict) and all(
+            isinstance(item.get(field), str) and item[field].strip() for field in BATCH_REQUIRED_FIELDS
+        ):
+            results.append(item)
+        else:
+            print(f"[LLM] Malformed batch entry {i + 1}, using stub parser")
+            inc("taskpilot_stub_fallbacks_total", reason="malformed_batch_entry")
+            results.append(parse_with_stub(text))
+    return results
+
+WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+}
+RELATIVE_DAYS = {"yesterday": -1, "today": 0, "tomorrow": 1}
+
+ASSIGN_VERBS = ("remind", "ask", "tell")
+# Whole words only: prefixes would also match "replace" or "responsible"
+SUMMARY_WORDS = {"summarize", "summarise", "summarizes", "summarises", "summarized", "summarised",
+                 "summarizing", "summarising", "summary", "summaries"}
+CONFIRM_WORDS = {"confirm", "confirms", "confirmed", "confirming", "confirmation"}
+RESPONSE_WORDS = SUMMARY_WORDS | CONFIRM_WORDS | {
+    "reply", "replies", "replied", "replying",
+    "respond", "responds", "responded", "responding", "response", "responses",
+}
+TRAILING_PUNCTUATION = ".,;:!?)\"'"
+
+# Keyword table for the single-pass tokenizer: word -> (kind, value)
+STUB_KEYWORDS = {verb: ("verb", None) for verb in ASSIGN_VERBS}
+STUB_KEYWORDS.update({day: ("weekday", n) for day, n in WEEKDAYS.items()})
+STUB_KEYWORDS.update({day: ("relative", n) for day, n in RELATIVE_DAYS.items()})
+STUB_KEYWORDS["next"] = ("next", None)
+
+# Words that lower the stub's confidence: pronouns and words that can't be
+# a recipient's name, date/time words it can't read, and hints that a
+# response is wanted without one of the RESPONSE_WORDS
+NOT_RECIPIENTS = {"me", "him", "her", "them", "us", "everyone", "the", "a", "to", "about", "that"}
+MULTIPLE_RECIPIENTS = {"and", "&", "or"}
+DATE_HINTS = {
+    "eod", "eow", "noon", "midnight", "tonight", "morning", "afternoon", "evening",
+    "week", "weekend", "month", "quarter", "end", "am", "pm",
+    "january", "february", "march", "april", "june", "july", "august",
+    "september", "october", "november", "december",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+RESPONSE_HINTS = {"know", "back", "feedback", "answer"}
+TAIL_WORDS = {"and", "then", "please", "me", "a", "the", "with"}
+# Words left in front of a date ("by Friday", "this Friday") that are cut
+# from the end of the task, and words a task can't end in once they are
+DATE_LEADS = {"by", "on", "for", "before", "until", "till", "this", "next", "due"}
+FUNCTION_WORDS = {"a", "an", "the", "to", "of", "and", "or", "with", "at", "in", "from", "about", "my", "our", "your"}
+RESPONSE_LEADS = {"and", "then", "please"}
+
+@timed("parse_with_stub")
+def parse_with_stub(raw_text, now=None):
     """
     Fallback stub parser with basic pattern matching
+
+    The text is tokenized in a single pass over its words; now is the
+    reference timestamp for relative dates (defaults to the current time).
     """
-    # Basic pattern matching for common task formats
-    text_lower = raw_text.lower()
-    
-    # Extract recipient (look for names after "remind", "ask", "tell")
+    return _stub_parse(raw_text, now or datetime.now(), scored=False)[0]
+
+@timed("parse_with_stub")
+def parse_with_stub_scored(raw_text, now=None):
+    """
+    Run the stub parser and return (parsed, confidence), where confidence
+    maps each field to a score between 0 and 1
+    """
+    return _stub_parse(raw_text, now or datetime.now())
+
+def _stub_parse(raw_text, now, scored=True):
+    """
+    Return (parsed, confidence); without scored, confidence is None and
+    the per-field scoring is skipped
+    """
+    raw_words = raw_text.split()
+    words = raw_text.lower().split()
     recipient = "Unknown"
-    words = raw_text.split()
-    
-    # Look for patterns like "remind [name]", "ask [name]", "tell [name]"
+    recipient_index = None
+    date_index = None
+    date_end = None
+    due_date = None
+    response_required = False
+    response_index = None
+    summarize = False
+    confirm = False
+    date_hint = False
+    response_hint = raw_text.rstrip().endswith("?")
+
     for i, word in enumerate(words):
-        if word.lower() in ["remind", "ask", "tell"] and i + 1 < len(words):
-            recipient = words[i + 1]
-            break
-    
-    # Extract task (everything between recipient and date/time indicators)
-    task = raw_text
-    date_indicators = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", 
-                      "today", "tomorrow", "next", "yesterday", "friday", "saturday", "sunday"]
-    
-    for indicator in date_indicators:
-        if indicator in text_lower:
-            parts = text_lower.split(indicator)
-            if len(parts) > 1:
-                task = parts[0].strip()
-                break
-    
-    # Determine due date (simplified)
-    due_date = datetime.now() + timedelta(days=1)  # Default to tomorrow
-    if "yesterday" in text_lower:
-        due_date = datetime.now() - timedelta(days=1)
-    elif "today" in text_lower:
-        due_date = datetime.now()
-    elif "tomorrow" in text_lower:
-        due_date = datetime.now() + timedelta(days=1)
-    elif "friday" in text_lower:
-        due_date = datetime.now() + timedelta(days=(4 - datetime.now().weekday()) % 7)
-    elif "monday" in text_lower:
-        due_date = datetime.now() + timedelta(days=(7 - datetime.now().weekday()) % 7)
-    elif "next" in text_lower and "monday" in text_lower:
-        due_date = datetime.now() + timedelta(days=(7 - datetime.now().weekday()) % 7 + 7)
-    elif "next" in text_lower and "friday" in text_lower:
-        due_date = datetime.now() + timedelta(days=(4 - datetime.now().weekday()) % 7 + 7)
-    
-    # Check if response is required
-    response_required = any(word in text_lower for word in ["summarize", "reply", "response", "confirm"])
-    
-    # Determine output format
-    output = "confirmation"
-    if "summarize" in text_lower:
-        output = "summary"
+        stripped = word.rstrip(TRAILING_PUNCTUATION)
+        kind, value = STUB_KEYWORDS.get(stripped, (None, None))
+
+        if kind is None:
+            if stripped in RESPONSE_WORDS:
+                response_required = True
+                if response_index is None:
+                    response_index = i
+                summarize = summarize or stripped in SUMMARY_WORDS
+                confirm = confirm or stripped in CONFIRM_WORDS
+            elif stripped in DATE_HINTS or stripped[:1].isdigit():
+                date_hint = True
+            elif stripped in RESPONSE_HINTS:
+                response_hint = True
+        elif kind == "verb":
+            # "remind [name]", "ask [name]", "tell [name]"
+            if recipient == "Unknown" and i + 1 < len(words):
+                recipient = raw_words[i + 1]
+                recipient_index = i + 1
+        elif date_index is None:
+            # The first date expression ends the task and sets the due date
+            date_index = date_end = i
+            if kind == "relative":
+                due_date = now + timedelta(days=value)
+            elif kind == "weekday":
+                due_date = now + timedelta(days=(value - now.weekday()) % 7)
+            elif i + 1 < len(words):
+                # "next [weekday]" is the weekday of the following week
+                following = STUB_KEYWORDS.get(words[i + 1].rstrip(TRAILING_PUNCTUATION))
+                if following and following[0] == "weekday":
+                    due_date = now + timedelta(days=(following[1] - now.weekday()) % 7 + 7)
+                    date_end = i + 1
+        elif i > date_end:
+            # A second date expression the stub ignores
+            date_hint = True
+
+    # Extract task: what follows "[verb] [name] to", up to the first
+    # date/time indicator, without the words leading into the date
+    has_to = recipient_index is not None and recipient_index + 1 < len(words) and words[recipient_index + 1] == "to"
+    task_words = raw_words[recipient_index + 2 if has_to else 0:date_index]
+    while task_words and task_words[-1].lower().rstrip(TRAILING_PUNCTUATION) in DATE_LEADS:
+        task_words.pop()
+    if task_words:
+        task_words[-1] = task_words[-1].rstrip(",;:")
+    task = " ".join(task_words) or raw_text
     
-    return {
+    # The stub reads days, never times: dates are date-only, so reminders
+    # fall at REMINDER_HOUR rather than at the moment of parsing
+    parsed = {
         "recipient": recipient,
         "task": task,
-        "due_date": due_date.isoformat(),
+        "due_date": (due_date or now + timedelta(days=1)).date().isoformat(),  # Default to tomorrow
         "response_required": response_required,
-        "output": output
+        "output": "summary" if summarize else "confirmation"
+    }
+    if not scored:
+        return parsed, None
+
+    # Recipient: a capitalized name after the verb, not followed by a
+    # surname/initial or a second recipient
+    if recipient_index is None:
+        recipient_score = 0.0
+    else:
+        name = recipient.rstrip(TRAILING_PUNCTUATION)
+        following = words[recipient_index + 1] if recipient_index + 1 < len(words) else ""
+        if name.lower() in NOT_RECIPIENTS or not name.isalpha() or not name[0].isupper():
+            recipient_score = 0.3
+        elif following in MULTIPLE_RECIPIENTS or recipient.endswith(","):
+            recipient_score = 0.4
+        elif following and following != "to" and raw_words[recipient_index + 1][:1].isupper():
+            recipient_score = 0.6
+        else:
+            recipient_score = 0.95
+
+    # Task: "[verb] [name] to ..." with nothing unexplained after the date
+    if has_to and task_words:
+        task_score = 0.9
+    else:
+        task_score = 0.5 if recipient_index is not None else 0.3
+    if task_words and task_words[-1].lower().rstrip(TRAILING_PUNCTUATION) in FUNCTION_WORDS:
+        # Cut mid-phrase ("book the room for the"): leave it to the LLM
+        task_score = min(task_score, 0.5)
+    if date_end is not None and any(
+        word.rstrip(TRAILING_PUNCTUATION) not in TAIL_WORDS and word.rstrip(TRAILING_PUNCTUATION) not in RESPONSE_WORDS
+        for word in words[date_end + 1:]
+    ):
+        task_score = min(task_score, 0.6)
+
+    # Due date: a date we read, or none mentioned at all
+    if due_date is not None:
+        due_date_score = 0.6 if date_hint else 0.95
+    else:
+        due_date_score = 0.2 if date_hint or date_index is not None else 0.8
+
+    if response_required:
+        # "... and summarize", or after the date: a request to report back.
+        # Inside the task ("to reply to the customer") it may be the task itself.
+        if (date_end is not None and response_index > date_end) or (
+                response_index > 0 and words[response_index - 1] in RESPONSE_LEADS):
+            response_score = 0.9
+        else:
+            response_score = 0.6
+        output_score = 0.9 if summarize or confirm else 0.6
+    else:
+        response_score = output_score = 0.4 if response_hint else 0.8
+
+    confidence = {
+        "recipient": recipient_score,
+        "task": task_score,
+        "due_date": due_date_score,
+        "response_required": response_score,
+        "output": output_score,
     }
+    return parsed, confidence
+
+def log_tier_decision(raw_text, tier, confidence, weak, stub=None, parsed=None):
+    """
+    Record which tier parsed a task, with the stub's confidence scores
+
+    When OpenAI was called, the TASKPILOT_TIER_LOG entry also records which
+    stub fields it agreed with, for tuning the thresholds.
+    """
+    inc("taskpilot_parse_tier_total", tier=tier)
+    for field in weak:
+        inc("taskpilot_parse_low_confidence_total", field=field)
+    scores = " ".join(f"{field}={score:.2f}" for field, score in confidence.items())
+    print(f"[LLM] Parsed by {tier} ({scores})")
+
+    if not TIER_LOG_PATH:
+        return
+    entry = {"ts": time.time(), "input": raw_text, "tier": tier, "confidence": confidence, "weak": weak}
+    if stub is not None and parsed is not None:
+        entry["agreed"] = {field: _same_value(field, stub[field], parsed.get(field)) for field in confidence}
+    line = json.dumps(entry) + "\n"
+    with _tier_log_lock:
+        with open(TIER_LOG_PATH, "a") as f:
+            f.write(line)
+
+_tier_log_lock = threading.Lock()
+
+def _same_value(field, stub_value, value):
+    if field == "due_date":
+        # Compare the day only; OpenAI rarely echoes the stub's time of day
+        return str(stub_value)[:10] == str(value)[:10]
+    return str(stub_value).strip().lower() == str(value).strip().lower()
+
+def parse_with_stub_batch(raw_texts, now=None):
+    """
+    Run the stub parser over many instructions with one reference timestamp
+    """
+    now = now or datetime.now()
+    # Time the batch as a whole rather than paying the hook per instruction
+    start = time.perf_counter()
+    # Nothing here uses the confidence scores, so they aren't computed
+    results = [_stub_parse(raw_text, now, scored=False)[0] for raw_text in raw_texts]
+    observe("taskpilot_stage_seconds", time.perf_counter() - start, stage="parse_with_stub_batch")
+    return results
 
 def validate_and_clean_parsed_task(parsed, original_text):
     """
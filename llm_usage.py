@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+from metrics import inc, observe
+
+USAGE_LOG_PATH = os.getenv('TASKPILOT_USAGE_LOG', '')
+# USD per million tokens, for the cost estimate (defaults: gpt-3.5-turbo)
+OPENAI_INPUT_PRICE = float(os.getenv('OPENAI_INPUT_PRICE', '0.5'))
+OPENAI_OUTPUT_PRICE = float(os.getenv('OPENAI_OUTPUT_PRICE', '1.5'))
+USAGE_HOURS = 48  # hourly totals kept in memory
+
+class UsageLedger:
+    """
+    Hourly totals of OpenAI tokens, latency and cost
+
+    Each call's usage (from the response, or the last chunk of a stream)
+    is added to the totals of its hour and model. With a log path, an
+    hour's totals are appended as a JSON line once the hour is over and
+    at shutdown, one line per process; sum lines with the same hour for
+    the overall figures.
+    """
+
+    def __init__(self, log_path=USAGE_LOG_PATH):
+        self.log_path = log_path
+        self._hours = {}  # (hour start, model) -> totals
+        self._written = set()  # keys of finished hours already logged
+        self._lock = threading.Lock()
+
+    def record(self, model, usage, latency, first_token=None, tasks=1):
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+
+        inc("taskpilot_llm_tokens_total", prompt_tokens, type="prompt")
+        inc("taskpilot_llm_tokens_total", completion_tokens, type="completion")
+        if cached_tokens:
+            inc("taskpilot_llm_tokens_total", cached_tokens, type="cached")
+        if first_token is not None:
+            observe("taskpilot_stage_seconds", first_token, stage="openai_first_token")
+
+        hour = int(time.time() // 3600 * 3600)
+        with self._lock:
+            totals = self._hours.get((hour, model))
+            if totals is None:
+                totals = self._hours[(hour, model)] = dict.fromkeys(
+                    ("calls", "tasks", "prompt_tokens", "completion_tokens", "cached_tokens",
+                     "latency_s", "first_token_s", "first_token_calls"), 0)
+                self._log_hours(hour)
+            totals["calls"] += 1
+            totals["tasks"] += tasks
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            totals["cached_tokens"] += cached_tokens
+            totals["latency_s"] += latency
+            if first_token is not None:
+                totals["first_token_s"] += first_token
+                totals["first_token_calls"] += 1
+        return prompt_tokens, completion_tokens
+
+    def report(self):
+        """
+        Hourly summaries, oldest first
+        """
+        with self._lock:
+            return [_summary(hour, model, totals) for (hour, model), totals in sorted(self._hours.items())]
+
+    def flush(self):
+        """
+        Log the totals not logged yet, e.g. at shutdown
+        """
+        with self._lock:
+            self._log_hours(float("inf"))
+
+    def _log_hours(self, before):
+        finished = sorted(key for key in self._hours if key[0] < before and key not in self._written)
+        self._write([(key, self._hours[key]) for key in finished])
+        self._written.update(finished)
+        oldest = time.time() - USAGE_HOURS * 3600
+        for key in [key for key in self._hours if key[0] < oldest]:
+            del self._hours[key]
+            self._written.discard(key)
+
+    def _write(self, hours):
+        if not self.log_path or not hours:
+            return
+        try:
+            with open(self.log_path, "a") as f:
+                for (hour, model), totals in hours:
+                    f.write(json.dumps(dict(_summary(hour, model, totals), pid=os.getpid())) + "\n")
+        except OSError as e:
+            print(f"[LLM] Could not write usage log: {e}")
+
+def _summary(hour, model, totals):
+    calls, tasks = totals["calls"], totals["tasks"]
+    cost = (totals["prompt_tokens"] * OPENAI_INPUT_PRICE + totals["completion_tokens"] * OPENAI_OUTPUT_PRICE) / 1e6
+    return {
+        "hour": time.strftime("%Y-%m-%dT%H:00", time.localtime(hour)),
+        "model": model,
+        "calls": calls,
+        "tasks": tasks,
+        "prompt_tokens": totals["prompt_tokens"],
+        "completion_tokens": totals["completion_tokens"],
+        "cached_tokens": totals["cached_tokens"],
+        "prompt_tokens_per_task": round(totals["prompt_tokens"] / tasks, 1) if tasks else 0,
+        "cost_usd": round(cost, 6),
+        "avg_latency_ms": round(totals["latency_s"] / calls * 1000, 1) if calls else 0,
+        "avg_first_token_ms": (round(totals["first_token_s"] / totals["first_token_calls"] * 1000, 1)
+                               if totals["first_token_calls"] else None),
+    }
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+def get_usage_ledger():
+    """
+    Return the process-wide usage ledger, creating it on first use
+    """
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger()
+        return _ledger
+
+def record_usage(model, usage, latency, first_token=None, tasks=1):
+    """
+    Account one OpenAI call and print its tokens and timing
+    """
+    prompt_tokens, completion_tokens = get_usage_ledger().record(model, usage, latency, first_token, tasks)
+    timing = f"{latency * 1000:.0f}ms" + (f", first token {first_token * 1000:.0f}ms" if first_token is not None else "")
+    print(f"[LLM] {prompt_tokens}+{completion_tokens} tokens in {timing}")
+
+def usage_summary():
+    """
+    One line totalling the usage recorded so far in this process, or None
+    """
+    report = get_usage_ledger().report()
+    if not report:
+        return None
+    calls = sum(hour["calls"] for hour in report)
+    tasks = sum(hour["tasks"] for hour in report)
+    prompt_tokens = sum(hour["prompt_tokens"] for hour in report)
+    completion_tokens = sum(hour["completion_tokens"] for hour in report)
+    cost = sum(hour["cost_usd"] for hour in report)
+    return (f"{calls} OpenAI calls for {tasks} tasks, {prompt_tokens}+{completion_tokens} tokens "
+            f"({prompt_tokens / tasks:.0f} prompt tokens/task), ${cost:.4f}")
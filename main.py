@@ -1,22 +1,56 @@
 import os
+import signal
 import sys
-from dotenv import load_dotenv
-from llm_parser import parse_task
-from slack_interface import get_user_input, send_to_slack, test_slack_connection, start_socket_mode_client, handle_socket_mode_events
+import threading
+
+def load_env_file():
+    """
+    Load the nearest .env file at or above this script's directory,
+    importing python-dotenv only when there is one
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
+
+# Load environment variables from .env file before the modules below read
+# their settings at import time
+load_env_file()
 
-# Load environment variables from .env file
-load_dotenv()
+from llm_parser import parse_task
+from slack_interface import get_user_input, send_to_slack, test_slack_connection, start_socket_mode_client, handle_socket_mode_events, reply_busy, prefetch_recipient, send_reminder, flush_digests, start_outbox_retrier
+from task_store import get_task_store
+from event_dispatcher import EventDispatcher
+from clients import close_clients
+from metrics import register_gauge, start_metrics_server, timed
+from llm_usage import get_usage_ledger, usage_summary
 
 def main():
     """
     Simple TaskPilot AI - LLM parsing and Slack bot integration
     """
+    # Bulk mode writes JSONL to stdout, so it runs before the banner
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        run_bulk_mode(sys.argv[2] if len(sys.argv) > 2 else "-")
+        return
+    
     print("🤖 TaskPilot AI - Simple LLM + Slack Bot")
     print("="*50)
     
     # Check command line arguments
     if len(sys.argv) > 1 and sys.argv[1] == "socket":
-        run_socket_mode()
+        workers = int(get_option("--workers", "1"))
+        if workers > 1:
+            run_socket_supervisor(workers)
+        else:
+            run_socket_mode()
         return
     
     # Check if OpenAI API key is available
@@ -26,9 +60,12 @@ def main():
     else:
         print("❌ OpenAI API Key: Not found (will use stub parser)")
     
-    # Test Slack connection
-    print("\n🔗 Testing Slack connection...")
-    slack_connected = test_slack_connection()
+    # Test Slack connection (cached between runs; skip entirely with --skip-preflight)
+    if "--skip-preflight" in sys.argv:
+        print("\n⏭️  Skipping Slack connection test")
+    else:
+        print("\n🔗 Testing Slack connection...")
+        test_slack_connection()
     
     # Get task from user
     raw_input = get_user_input()
@@ -36,14 +73,21 @@ def main():
     
     # Parse with LLM
     print("\n🧠 Parsing task with LLM...")
-    parsed = parse_task(raw_input)
+    parsed = parse_task(raw_input, on_recipient=prefetch_recipient)
     print(f"✅ Parsed: {parsed}")
     
     # Send to Slack
     print("\n📱 Sending to Slack...")
-    send_to_slack(parsed)
+    sent = send_to_slack(parsed)
+    flush_digests()
+    get_usage_ledger().flush()
+    if hasattr(sent, 'result'):
+        sent = sent.result()
     
-    print("\n✅ Task processed successfully!")
+    if sent:
+        print("\n✅ Task processed successfully!")
+    else:
+        print("\n✅ Task processed (not sent to Slack, see above)")
 
 def run_socket_mode():
     """
@@ -71,21 +115,139 @@ def run_socket_mode():
         print("❌ Failed to initialize Socket Mode client")
         return
     
+    # Start the worker pool that parses and sends tasks off the listener thread
+    dispatcher = EventDispatcher(
+        process_task_event,
+        on_busy=lambda event: reply_busy(client.web_client, event)
+    ).start()
+    
+    register_gauge("taskpilot_queue_depth", dispatcher.queue_depth)
+    
+    # Fire reminders and follow-ups for stored tasks as they come due
+    scheduler = None
+    store = get_task_store()
+    if store:
+        from due_scheduler import DueScheduler, set_due_scheduler
+        scheduler = DueScheduler(store, send_reminder).start()
+        set_due_scheduler(scheduler)
+        register_gauge("taskpilot_scheduled_tasks", scheduler.pending)
+    
+    # Resend tasks left in the outbound journal by failed sends or a restart
+    retrier = start_outbox_retrier()
+    if retrier:
+        register_gauge("taskpilot_outbox_pending", lambda: retrier.journal.counts().get('pending', 0))
+    
+    metrics_server = start_metrics_server()
+    
     # Set up event handlers
-    handle_socket_mode_events(client)
+    handle_socket_mode_events(client, dispatcher)
     
     print("\n🎧 TaskPilot AI is now listening for Slack events...")
     print("   Press Ctrl+C to stop")
     
+    # Treat SIGTERM (e.g. from the supervisor) like Ctrl+C so queued tasks drain
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    
     try:
-        # Start the Socket Mode client
+        # Start the Socket Mode client; it runs on background threads
         client.connect()
+        
+        heartbeat_file = os.getenv('TASKPILOT_HEARTBEAT_FILE')
+        if heartbeat_file:
+            from socket_supervisor import start_heartbeat
+            start_heartbeat(client, heartbeat_file)
+        
+        threading.Event().wait()
     except KeyboardInterrupt:
         print("\n👋 Shutting down Socket Mode client...")
         client.close()
     except Exception as e:
         print(f"❌ Error in Socket Mode: {e}")
         client.close()
+    finally:
+        if scheduler:
+            scheduler.stop()
+        if retrier:
+            retrier.stop()
+        dispatcher.shutdown()
+        flush_digests()
+        close_clients()
+        get_usage_ledger().flush()
+        if metrics_server:
+            metrics_server.shutdown()
+
+def run_socket_supervisor(workers):
+    """
+    Run several Socket Mode worker processes under a supervisor
+    """
+    from socket_supervisor import SocketSupervisor
+    
+    for name in ('OPENAI_API_KEY', 'SLACK_BOT_TOKEN', 'SLACK_APP_TOKEN'):
+        if not os.getenv(name):
+            print("❌ Missing required environment variables for Socket Mode")
+            print("   Required: OPENAI_API_KEY, SLACK_BOT_TOKEN, SLACK_APP_TOKEN")
+            return
+    
+    SocketSupervisor(workers).run()
+
+def get_option(name, default=None):
+    """
+    Return the value following name in the command line arguments
+    """
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def run_bulk_mode(path):
+    """
+    Process a file (or stdin with "-") of tasks, one per line, writing a
+    JSONL result record per task to stdout
+    """
+    from bulk_pipeline import run_bulk
+    
+    stream = sys.stdin if path == "-" else open(path)
+    retrier = start_outbox_retrier()
+    try:
+        processed, failed = run_bulk(stream, sys.stdout)
+    finally:
+        if retrier:
+            retrier.stop()
+        if stream is not sys.stdin:
+            stream.close()
+        close_clients()
+        get_usage_ledger().flush()
+    
+    print(f"✅ Bulk run complete: {processed} tasks, {failed} with errors", file=sys.stderr)
+    usage = usage_summary()
+    if usage:
+        print(f"📊 {usage}", file=sys.stderr)
+
+@timed("process_task")
+def process_task_event(event):
+    """
+    Parse a Slack message into a task and send it (runs on a worker thread)
+    """
+    text = event.get('text', '').strip()
+    if not text:
+        return
+    
+    # A reply in a task's thread is never a new task; it answers the task
+    # only when it comes from the recipient
+    thread_ts = event.get('thread_ts')
+    if thread_ts and thread_ts != event.get('ts'):
+        store = get_task_store()
+        if store and store.is_task_message(thread_ts):
+            task = store.find_by_message(thread_ts, event.get('user'))
+            if task and task['next_at'] is not None:
+                store.complete(task['id'])
+                print(f"✅ Task {task['id']} answered by {event.get('user')}")
+            return
+    
+    parsed = parse_task(text, on_recipient=prefetch_recipient)
+    print(f"✅ Parsed: {parsed}")
+    send_to_slack(parsed)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
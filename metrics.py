@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+METRICS_PORT = int(os.getenv('TASKPILOT_METRICS_PORT', '9464'))
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow LLM calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# name -> (type, help)
+METRICS = {
+    "taskpilot_stage_seconds": ("histogram", "Latency of pipeline stages"),
+    "taskpilot_stub_fallbacks_total": ("counter", "Tasks parsed by the stub parser instead of OpenAI"),
+    "taskpilot_parse_tier_total": ("counter", "Tasks parsed by each tier (stub, llm, llm_fields)"),
+    "taskpilot_parse_low_confidence_total": ("counter", "Stub parse fields below their confidence threshold"),
+    "taskpilot_slack_errors_total": ("counter", "Slack API errors by error code"),
+    "taskpilot_slack_ratelimited_total": ("counter", "Slack 429 responses retried after Retry-After"),
+    "taskpilot_events_deduplicated_total": ("counter", "Redelivered Socket Mode events dropped as duplicates"),
+    "taskpilot_events_shed_total": ("counter", "Socket Mode events dropped because the queue was full"),
+    "taskpilot_queue_depth": ("gauge", "Socket Mode events waiting for a worker"),
+    "taskpilot_reminders_total": ("counter", "Task reminders and follow-ups sent by the due-date scheduler"),
+    "taskpilot_scheduled_tasks": ("gauge", "Tasks held in the due-date scheduler's heap"),
+    "taskpilot_outbox_total": ("counter", "Outbound journal entries sent, retried, found already delivered or given up"),
+    "taskpilot_outbox_pending": ("gauge", "Outbound journal entries waiting to be sent"),
+    "taskpilot_breaker_transitions_total": ("counter", "Circuit breaker state changes"),
+    "taskpilot_llm_tokens_total": ("counter", "OpenAI tokens used, by type (prompt, completion, cached)"),
+    "taskpilot_openai_breaker_state": ("gauge", "OpenAI circuit breaker state (0 closed, 1 half-open, 2 open)"),
+}
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_gauges = {}
+
+def observe(name, value, **labels):
+    """
+    Record value in histogram name
+    """
+    _observe((name, tuple(sorted(labels.items()))), value)
+
+def _observe(key, value):
+    index = bisect_left(LATENCY_BUCKETS, value)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            # Per-bucket counts (last slot is +Inf), sum, count
+            histogram = _histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+        histogram[0][index] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+def inc(name, amount=1, **labels):
+    """
+    Increment counter name
+    """
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+def register_gauge(name, callback):
+    """
+    Report the value returned by callback as gauge name at scrape time
+    """
+    _gauges[name] = callback
+
+class timer:
+    """
+    Context manager recording the elapsed time of a stage
+    """
+    __slots__ = ("key", "start")
+
+    def __init__(self, stage):
+        self.key = _stage_key(stage)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _observe(self.key, time.perf_counter() - self.start)
+        return False
+
+def timed(stage):
+    """
+    Decorator recording the latency of every call as stage
+    """
+    key = _stage_key(stage)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _observe(key, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def _stage_key(stage):
+    return ("taskpilot_stage_seconds", (("stage", stage),))
+
+def render():
+    """
+    Render all metrics in the Prometheus text exposition format
+    """
+    with _lock:
+        histograms = {key: (list(h[0]), h[1], h[2]) for key, h in _histograms.items()}
+        counters = dict(_counters)
+    gauges = {}
+    for name, callback in list(_gauges.items()):
+        try:
+            gauges[(name, ())] = callback()
+        except Exception:
+            continue
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {total}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        else:
+            values = counters if kind == "counter" else gauges
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+def _metrics_handler():
+    # http.server is only imported when the endpoint is started
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            data = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+def start_metrics_server(port=METRICS_PORT):
+    """
+    Serve /metrics on a background thread. Returns the server, or None if
+    the port is 0 or cannot be bound.
+    """
+    if not port:
+        return None
+    from http.server import ThreadingHTTPServer
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), _metrics_handler())
+    except OSError as e:
+        print(f"⚠️  Metrics endpoint disabled: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Metrics available at http://localhost:{port}/metrics")
+    return server
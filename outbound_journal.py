@@ -0,0 +1,269 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+OUTBOX_PATH = os.getenv('TASKPILOT_OUTBOX_PATH', '.taskpilot_outbox.sqlite3')
+OUTBOX_RETRY_BASE = float(os.getenv('TASKPILOT_OUTBOX_RETRY_BASE', '5'))  # seconds
+OUTBOX_RETRY_MAX = float(os.getenv('TASKPILOT_OUTBOX_RETRY_MAX', '900'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('TASKPILOT_OUTBOX_MAX_ATTEMPTS', '20'))
+OUTBOX_POLL_INTERVAL = 5
+OUTBOX_BATCH = 50
+# How long a process may go without a heartbeat before the deliveries it
+# holds are taken over by another process's retrier
+INFLIGHT_LEASE = 120
+HEARTBEAT_INTERVAL = INFLIGHT_LEASE / 4
+
+# Entry lifecycle: inflight -> sent, or inflight -> pending -> inflight ...
+# while attempts fail, and failed after OUTBOX_MAX_ATTEMPTS. An inflight
+# entry belongs to the process sending it for as long as that process
+# heartbeats, however long it waits in a digest or behind a rate limit.
+# An entry is never re-parsed, only re-sent.
+
+class OutboundJournal:
+    """
+    Write-ahead journal of outbound Slack messages
+
+    Every parsed task is written here before it is sent and marked sent
+    once Slack acknowledges it, so a failed send or a crash leaves it
+    pending for the retrier instead of losing it. Each entry carries a
+    client_msg_id that goes out with the message: when an earlier attempt
+    may have been delivered (a timeout, a crash mid-send), the channel is
+    checked for it before posting again.
+
+    SQLite in WAL mode; entries are claimed with a conditional UPDATE so
+    several processes can share one journal. Each process heartbeats in
+    the owners table while it is alive; the inflight entries of a process
+    that stopped heartbeating (a crash) are claimed again by the others.
+    """
+
+    def __init__(self, path=OUTBOX_PATH):
+        import uuid
+        self._lock = threading.Lock()
+        self.owner = str(uuid.uuid4())
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY,
+                client_msg_id TEXT NOT NULL UNIQUE,
+                channel TEXT NOT NULL,
+                parsed TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                uncertain INTEGER NOT NULL DEFAULT 1,
+                next_attempt_at REAL,
+                last_error TEXT,
+                message_ts TEXT,
+                thread_ts TEXT,
+                owner TEXT,
+                attempted_at REAL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+        columns = {row['name'] for row in self._db.execute("PRAGMA table_info(outbox)")}
+        if 'thread_ts' not in columns:
+            # Journals from before thread-mode digests were journaled per reply
+            self._db.execute("ALTER TABLE outbox ADD COLUMN thread_ts TEXT")
+        if 'owner' not in columns:
+            # Journals from before inflight entries were held by their process
+            self._db.execute("ALTER TABLE outbox ADD COLUMN owner TEXT")
+            self._db.execute("ALTER TABLE outbox ADD COLUMN attempted_at REAL")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt_at) WHERE status = 'pending'"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_inflight ON outbox (owner) WHERE status = 'inflight'"
+        )
+        self._heartbeat()
+        threading.Thread(target=self._run_heartbeat, name="taskpilot-outbox-heartbeat", daemon=True).start()
+
+    def append(self, parsed_task, channel):
+        """
+        Journal a task about to be sent and return its entry. The entry is
+        held by this process until mark_sent or mark_failed records the
+        outcome.
+        """
+        import uuid
+        now = time.time()
+        client_msg_id = str(uuid.uuid4())
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO outbox (client_msg_id, channel, parsed, status, owner, created_at)"
+                " VALUES (?, ?, ?, 'inflight', ?, ?)",
+                (client_msg_id, channel, json.dumps(parsed_task), self.owner, now)
+            )
+            entry_id = cursor.lastrowid
+        return {"id": entry_id, "client_msg_id": client_msg_id, "channel": channel, "parsed": parsed_task,
+                "attempts": 0, "uncertain": True, "thread_ts": None, "attempted_at": None, "created_at": now}
+
+    def claim_due(self, limit=OUTBOX_BATCH):
+        """
+        Take over up to limit entries whose retry time has come, or that
+        were in flight in a process that stopped heartbeating, and return
+        them. Entries this process holds are never returned.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?"
+                " ORDER BY next_attempt_at LIMIT ?", (now, limit)
+            ).fetchall()
+            orphans = self._db.execute(
+                "SELECT outbox.* FROM outbox LEFT JOIN owners ON owners.owner = outbox.owner"
+                " WHERE outbox.status = 'inflight' AND outbox.owner != ?"
+                " AND (owners.seen_at IS NULL OR owners.seen_at < ?) LIMIT ?",
+                (self.owner, now - INFLIGHT_LEASE, max(0, limit - len(rows)))
+            ).fetchall()
+            claimed = []
+            for row in rows:
+                cursor = self._db.execute(
+                    "UPDATE outbox SET status = 'inflight', owner = ?"
+                    " WHERE id = ? AND status = 'pending' AND next_attempt_at = ?",
+                    (self.owner, row['id'], row['next_attempt_at'])
+                )
+                if cursor.rowcount == 1:
+                    claimed.append(_entry(row))
+            for row in orphans:
+                # The dead process may have posted it before going away
+                cursor = self._db.execute(
+                    "UPDATE outbox SET owner = ?, uncertain = 1 WHERE id = ? AND status = 'inflight' AND owner = ?",
+                    (self.owner, row['id'], row['owner'])
+                )
+                if cursor.rowcount == 1:
+                    entry = _entry(row)
+                    entry['uncertain'] = True
+                    claimed.append(entry)
+        return claimed
+
+    def mark_sent(self, entry_ids, message_ts):
+        with self._lock:
+            self._db.executemany(
+                "UPDATE outbox SET status = 'sent', next_attempt_at = NULL, owner = NULL, message_ts = ? WHERE id = ?",
+                [(message_ts, entry_id) for entry_id in entry_ids]
+            )
+
+    def set_thread(self, entry_ids, channel, thread_ts):
+        """
+        Record that the entries are to be posted as replies in the thread
+        thread_ts of channel (a thread-mode digest whose parent went out)
+        """
+        with self._lock:
+            self._db.executemany(
+                "UPDATE outbox SET channel = ?, thread_ts = ? WHERE id = ?",
+                [(channel, thread_ts, entry_id) for entry_id in entry_ids]
+            )
+
+    def mark_failed(self, entry_id, error, uncertain=False):
+        """
+        Record a failed attempt and schedule the next one with exponential
+        backoff and jitter. uncertain means the message may have been
+        posted anyway (e.g. a timeout). Returns the next attempt time, or
+        None once the entry has used up its attempts.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT attempts FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+            attempts = (row['attempts'] if row else 0) + 1
+            if attempts >= OUTBOX_MAX_ATTEMPTS:
+                status, next_attempt_at = 'failed', None
+            else:
+                delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * 2 ** (attempts - 1))
+                status, next_attempt_at = 'pending', now + random.uniform(delay / 2, delay)
+            self._db.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, uncertain = ?, next_attempt_at = ?, last_error = ?,"
+                " owner = NULL, attempted_at = ? WHERE id = ? AND status = 'inflight'",
+                (status, attempts, int(uncertain), next_attempt_at, str(error)[:500], now, entry_id)
+            )
+        return next_attempt_at
+
+    def counts(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    def _heartbeat(self):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO owners (owner, seen_at) VALUES (?, ?)", (self.owner, now))
+            # Rows of long-gone processes; a missing row reads as dead too
+            self._db.execute("DELETE FROM owners WHERE seen_at < ?", (now - 10 * INFLIGHT_LEASE,))
+
+    def _run_heartbeat(self):
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            try:
+                self._heartbeat()
+            except sqlite3.Error as e:
+                print(f"⚠️  Outbox heartbeat failed: {e}")
+
+def _entry(row):
+    return {"id": row['id'], "client_msg_id": row['client_msg_id'], "channel": row['channel'],
+            "parsed": json.loads(row['parsed']), "attempts": row['attempts'],
+            "uncertain": bool(row['uncertain']), "thread_ts": row['thread_ts'],
+            "attempted_at": row['attempted_at'], "created_at": row['created_at']}
+
+class OutboxRetrier:
+    """
+    Background thread replaying pending journal entries
+
+    deliver(entry) re-sends one entry and records the outcome in the
+    journal itself; the retrier only hands over entries as they come due,
+    including ones left pending by an earlier run.
+    """
+
+    def __init__(self, journal, deliver, interval=OUTBOX_POLL_INTERVAL):
+        self.journal = journal
+        self.deliver = deliver
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="taskpilot-outbox", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                entries = self.journal.claim_due()
+            except Exception as e:
+                print(f"⚠️  Outbox retrier could not read the journal: {e}")
+                entries = []
+            for entry in entries:
+                if self._stopping.is_set():
+                    return
+                print(f"🔁 Retrying task for {entry['parsed'].get('recipient')} (attempt {entry['attempts'] + 1})")
+                try:
+                    self.deliver(entry)
+                except Exception as e:
+                    print(f"⚠️  Retry of outbox entry {entry['id']} failed: {e}")
+                    # Hand it back rather than hold it for the life of the process
+                    self.journal.mark_failed(entry['id'], e, uncertain=True)
+            # A full batch means more may be due right away
+            if len(entries) < OUTBOX_BATCH:
+                self._stopping.wait(self.interval)
+
+_journal = None
+_journal_lock = threading.Lock()
+
+def get_outbound_journal():
+    """
+    Return the process-wide outbound journal, or None when
+    TASKPILOT_OUTBOX_PATH is empty
+    """
+    global _journal
+    with _journal_lock:
+        if _journal is None and OUTBOX_PATH:
+            _journal = OutboundJournal(OUTBOX_PATH)
+        return _journal
@@ -0,0 +1,157 @@
+import os
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+# Cache settings (override with environment variables)
+PARSE_CACHE_SIZE = int(os.getenv('TASKPILOT_PARSE_CACHE_SIZE', '10000'))
+PARSE_CACHE_TTL = int(os.getenv('TASKPILOT_PARSE_CACHE_TTL', '86400'))
+PARSE_CACHE_PATH = os.getenv('TASKPILOT_PARSE_CACHE_PATH', '.taskpilot_cache.sqlite3')
+PARSE_CACHE_DISK_SIZE = int(os.getenv('TASKPILOT_PARSE_CACHE_DISK_SIZE', '100000'))
+
+_WHITESPACE = re.compile(r"\s+")
+
+def cache_key(raw_text, reference_date=None):
+    """
+    Build a cache key from the normalized text and the reference date
+
+    The date is part of the key so relative dates ("tomorrow", "friday")
+    are re-parsed each day instead of returning a stale due_date.
+    """
+    reference_date = reference_date or date.today()
+    normalized = _WHITESPACE.sub(" ", raw_text.strip().lower())
+    return f"{reference_date.isoformat()}|{normalized}"
+
+class ParseCache:
+    """
+    Two-tier parse result cache: in-memory LRU in front of SQLite
+
+    Both tiers evict by size and by TTL. Set path to None to run memory-only.
+    The SQLite file runs in WAL mode so several processes can share it; a
+    disk error (e.g. "database is locked") counts as a miss or a skipped
+    write, never as a failed parse.
+    """
+
+    def __init__(self, max_size=PARSE_CACHE_SIZE, ttl=PARSE_CACHE_TTL, path=PARSE_CACHE_PATH,
+                 max_disk_size=PARSE_CACHE_DISK_SIZE):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_disk_size = max_disk_size
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+
+        if path:
+            try:
+                self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS parse_cache "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS parse_cache_created ON parse_cache (created)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Parse cache disk tier disabled: {e}")
+                self._db = None
+
+    def get(self, key):
+        """
+        Return a copy of the cached result for key, or None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            if entry:
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created FROM parse_cache WHERE key = ? AND created >= ?",
+                        (key, now - self.ttl)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"⚠️  Parse cache disk read failed: {e}")
+                    row = None
+                if row:
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.disk_hits += 1
+                    return dict(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Store a parse result under key in both tiers
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, dict(value), now)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO parse_cache (key, value, created) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), now)
+                    )
+                    self._writes += 1
+                    # Evict in bulk every so often rather than on every write
+                    if self._writes % 1000 == 0:
+                        self._evict_disk(now)
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️  Parse cache disk write skipped: {e}")
+                    self._db.rollback()
+
+    def stats(self):
+        """
+        Hit/miss counters and current memory tier size
+        """
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._memory),
+        }
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        self._db.execute("DELETE FROM parse_cache WHERE created < ?", (now - self.ttl,))
+        self._db.execute(
+            "DELETE FROM parse_cache WHERE key IN "
+            "(SELECT key FROM parse_cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_size,)
+        )
+
+_parse_cache = None
+_parse_cache_lock = threading.Lock()
+
+def get_parse_cache():
+    """
+    Return the process-wide parse cache, creating it on first use
+    """
+    global _parse_cache
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            _parse_cache = ParseCache()
+        return _parse_cache
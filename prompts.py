@@ -0,0 +1,69 @@
+import json
+from functools import lru_cache
+
+# Prompts are built once at import: the system message is byte-identical
+# on every call so the provider can cache it as a prompt prefix, and the
+# instruction itself always travels as its own user message, never
+# interpolated into the prompt.
+
+FIELD_DESCRIPTIONS = {
+    "recipient": "The person who should perform the task",
+    "task": "The actual task to be performed",
+    "due_date": "When the task should be done (in ISO format)",
+    "response_required": "Whether a response is needed (true/false)",
+    "output": "What output is expected (e.g., summary, confirmation, etc.)",
+}
+
+FIELD_TYPES = {
+    "recipient": "string",
+    "task": "string",
+    "due_date": "string",
+    "response_required": "boolean",
+    "output": "string",
+}
+
+_FIELDS = "".join(f"\n{field}: {description}" for field, description in FIELD_DESCRIPTIONS.items())
+
+# Per OPENAI_MODE; with a function call the field list is in its schema
+SYSTEM_PROMPTS = {
+    "text": f"Extract these fields from the user's task instruction:{_FIELDS}\nReply with only a JSON object.",
+    "tools": "Call record_task with the fields of the user's task instruction.",
+}
+SYSTEM_PROMPTS["stream"] = SYSTEM_PROMPTS["tools"]
+
+BATCH_SYSTEM_PROMPT = (
+    f"The user sends a JSON array of task instructions. Extract these fields from each:{_FIELDS}\n"
+    "Reply with only a JSON array holding one object per instruction, in order."
+)
+
+def task_messages(raw_text, mode):
+    return [{"role": "system", "content": SYSTEM_PROMPTS[mode]}, {"role": "user", "content": raw_text}]
+
+def batch_messages(raw_texts):
+    return [{"role": "system", "content": BATCH_SYSTEM_PROMPT}, {"role": "user", "content": json.dumps(raw_texts)}]
+
+def task_tool(fields=None):
+    """
+    Function definition whose arguments are the requested task fields
+    """
+    return _task_tool(tuple(fields or FIELD_DESCRIPTIONS))
+
+@lru_cache(maxsize=None)
+def _task_tool(fields):
+    # One definition per field set, so the tools part of the prompt prefix
+    # is identical from call to call as well
+    return {
+        "type": "function",
+        "function": {
+            "name": "record_task",
+            "description": "Record the fields extracted from a task instruction",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    field: {"type": FIELD_TYPES[field], "description": FIELD_DESCRIPTIONS[field]}
+                    for field in fields
+                },
+                "required": list(fields),
+            },
+        },
+    }
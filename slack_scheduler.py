@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from metrics import inc, observe
+
+# Slack Web API rate limit tiers, in requests per minute
+TIER_RATES = {1: 1, 2: 20, 3: 50, 4: 100}
+
+# Tier of each method we call. chat.postMessage has a "special" limit of
+# about one message per second per channel, handled by the channel buckets.
+METHOD_TIERS = {
+    "auth.test": 4,
+    "users.list": 2,
+    "users.info": 4,
+    "conversations.list": 2,
+    "conversations.history": 3,
+    "conversations.replies": 3,
+    "chat.update": 3,
+}
+
+CHANNEL_RATE = float(os.getenv('SLACK_CHANNEL_RATE', '1'))  # messages/second per channel
+CHANNEL_BURST = int(os.getenv('SLACK_CHANNEL_BURST', '5'))
+MAX_RATE_LIMIT_RETRIES = int(os.getenv('SLACK_MAX_RATE_LIMIT_RETRIES', '5'))
+
+def method_rates():
+    """
+    Per-method limits in requests per minute, from the tier table with
+    SLACK_METHOD_RATES overrides (e.g. "users.list=1200,chat.postMessage=600";
+    0 disables the limit)
+    """
+    rates = {method: TIER_RATES[tier] for method, tier in METHOD_TIERS.items()}
+    for override in filter(None, os.getenv('SLACK_METHOD_RATES', '').split(',')):
+        method, _, rate = override.partition('=')
+        rates[method.strip()] = float(rate)
+    return rates
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that hands out reservations
+
+    reserve() takes a token and returns how long the caller must wait
+    before using it, so waiters are served in arrival order. pause() holds
+    the bucket back after a 429.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def pause(self, seconds):
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = min(self.tokens, 0)
+            self.updated = now
+
+class SlackScheduler:
+    """
+    Outbound Web API scheduler honoring method tiers, per-channel limits and
+    Retry-After
+
+    Calls wait for a token from their method bucket and, for channel
+    methods, their channel bucket. A 429 pauses the method bucket for the
+    Retry-After period and the call is retried instead of failing.
+    """
+
+    def __init__(self, rates=None, channel_rate=CHANNEL_RATE, channel_burst=CHANNEL_BURST,
+                 max_retries=MAX_RATE_LIMIT_RETRIES):
+        rates = method_rates() if rates is None else rates
+        self.max_retries = max_retries
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self._method_buckets = {
+            # Allow a minute's worth of calls as the burst, like Slack does
+            method: TokenBucket(per_minute / 60, max(1, per_minute))
+            for method, per_minute in rates.items() if per_minute
+        }
+        self._channel_buckets = {}
+        self._lock = threading.Lock()
+
+    def call(self, method, func, **kwargs):
+        """
+        Call func(**kwargs) (the WebClient method for method) under the limits
+        """
+        from slack_sdk.errors import SlackApiError
+        channel = kwargs.get('channel') if method.startswith('chat.') else None
+        attempt = 0
+        while True:
+            wait = self._reserve(method, channel)
+            if wait > 0:
+                observe("taskpilot_stage_seconds", wait, stage="slack_rate_limit_wait")
+                time.sleep(wait)
+            try:
+                return func(**kwargs)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                retry_after = int(e.response.headers.get('Retry-After', 1))
+                inc("taskpilot_slack_ratelimited_total", method=method)
+                print(f"⏳ Slack rate limited {method}, retrying in {retry_after}s")
+                self._bucket(method, create=True).pause(retry_after)
+
+    def _reserve(self, method, channel):
+        wait = 0.0
+        bucket = self._bucket(method)
+        if bucket:
+            wait = bucket.reserve()
+        if channel and self.channel_rate:
+            with self._lock:
+                channel_bucket = self._channel_buckets.get(channel)
+                if channel_bucket is None:
+                    channel_bucket = self._channel_buckets[channel] = TokenBucket(self.channel_rate, self.channel_burst)
+            wait = max(wait, channel_bucket.reserve())
+        return wait
+
+    def _bucket(self, method, create=False):
+        bucket = self._method_buckets.get(method)
+        if bucket is None and create:
+            # Unlimited methods still need somewhere to record a Retry-After pause
+            with self._lock:
+                bucket = self._method_buckets.setdefault(method, TokenBucket(1e9, 1e9))
+        return bucket
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_slack_scheduler():
+    """
+    Return the process-wide outbound scheduler, creating it on first use
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SlackScheduler()
+        return _scheduler
@@ -0,0 +1,164 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+HEARTBEAT_INTERVAL = float(os.getenv('TASKPILOT_HEARTBEAT_INTERVAL', '10'))
+HEARTBEAT_TIMEOUT = float(os.getenv('TASKPILOT_HEARTBEAT_TIMEOUT', '60'))
+DRAIN_TIMEOUT = float(os.getenv('TASKPILOT_DRAIN_TIMEOUT', '30'))
+MAX_RESTART_BACKOFF = 60
+STABLE_RUN_SECONDS = 60
+
+# Shared state files, used by every worker unless already configured
+SHARED_STATE = {
+    'TASKPILOT_DEDUPE_PATH': '.taskpilot_dedupe.sqlite3',
+    'TASKPILOT_PARSE_CACHE_PATH': '.taskpilot_cache.sqlite3',
+    'TASKPILOT_TASK_STORE_PATH': '.taskpilot_tasks.sqlite3',
+    'TASKPILOT_OUTBOX_PATH': '.taskpilot_outbox.sqlite3',
+}
+
+class Worker:
+    """
+    One Socket Mode worker process and its restart bookkeeping
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at = 0.0
+        self.heartbeat_path = f".taskpilot_worker_{index}.heartbeat"
+
+    def heartbeat_age(self):
+        try:
+            return time.time() - os.path.getmtime(self.heartbeat_path)
+        except OSError:
+            return time.time() - self.started_at
+
+class SocketSupervisor:
+    """
+    Runs N Socket Mode worker processes, each with its own connection
+
+    Slack spreads events across an app's open connections, so CPU-side work
+    scales past one GIL. Workers share the user directory, parse cache and
+    dedupe state through SQLite files. The supervisor restarts workers that
+    exit or stop heartbeating, with exponential backoff, and drains them
+    with SIGTERM on shutdown.
+    """
+
+    def __init__(self, workers):
+        self.workers = [Worker(i) for i in range(workers)]
+        self._stopping = threading.Event()
+
+    def run(self):
+        for name, default in SHARED_STATE.items():
+            os.environ[name] = os.getenv(name) or default
+
+        signal.signal(signal.SIGTERM, lambda *args: self._stopping.set())
+        signal.signal(signal.SIGINT, lambda *args: self._stopping.set())
+
+        self._warm_shared_state()
+        for worker in self.workers:
+            self._start(worker)
+
+        print(f"🧭 Supervisor running {len(self.workers)} Socket Mode workers (Ctrl+C to stop)")
+        while not self._stopping.wait(1):
+            for worker in self.workers:
+                self._check(worker)
+
+        self._drain()
+
+    def _warm_shared_state(self):
+        # Walk the user directory once here so workers load the snapshot
+        # instead of each paging through users_list
+        from clients import get_slack_client
+        from slack_interface import UserDirectory
+        try:
+            client = get_slack_client(os.environ['SLACK_BOT_TOKEN'])
+            UserDirectory(client).refresh()
+        except Exception as e:
+            print(f"⚠️  Could not preload user directory: {e}")
+
+    def _start(self, worker):
+        try:
+            os.remove(worker.heartbeat_path)
+        except OSError:
+            pass
+        env = dict(os.environ)
+        env['TASKPILOT_WORKER_INDEX'] = str(worker.index)
+        env['TASKPILOT_HEARTBEAT_FILE'] = worker.heartbeat_path
+        metrics_port = int(os.getenv('TASKPILOT_METRICS_PORT', '9464'))
+        env['TASKPILOT_METRICS_PORT'] = str(metrics_port + worker.index if metrics_port else 0)
+
+        worker.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(sys.argv[0]), "socket"], env=env
+        )
+        worker.started_at = time.time()
+        print(f"🚀 Worker {worker.index} started (pid {worker.process.pid})")
+
+    def _check(self, worker):
+        now = time.time()
+        if worker.process is None:
+            if now >= worker.restart_at:
+                self._start(worker)
+            return
+
+        exit_code = worker.process.poll()
+        if exit_code is None and worker.heartbeat_age() <= HEARTBEAT_TIMEOUT:
+            if now - worker.started_at > STABLE_RUN_SECONDS:
+                worker.failures = 0
+            return
+
+        if exit_code is None:
+            print(f"💔 Worker {worker.index} missed its heartbeat, restarting")
+            self._stop(worker.process)
+        else:
+            print(f"💥 Worker {worker.index} exited with code {exit_code}")
+
+        # Reconnect with exponential backoff
+        delay = min(MAX_RESTART_BACKOFF, 2 ** worker.failures)
+        worker.failures += 1
+        worker.process = None
+        worker.restart_at = now + delay
+        print(f"   Restarting worker {worker.index} in {delay}s")
+
+    def _drain(self):
+        print("\n👋 Draining workers...")
+        running = [w.process for w in self.workers if w.process and w.process.poll() is None]
+        for process in running:
+            process.send_signal(signal.SIGTERM)
+        deadline = time.time() + DRAIN_TIMEOUT
+        for process in running:
+            try:
+                process.wait(timeout=max(0, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for worker in self.workers:
+            try:
+                os.remove(worker.heartbeat_path)
+            except OSError:
+                pass
+
+    def _stop(self, process):
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=DRAIN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def start_heartbeat(client, path, interval=HEARTBEAT_INTERVAL):
+    """
+    Touch path every interval seconds while client is connected, so the
+    supervisor can tell a live worker from a stuck one
+    """
+    def beat():
+        while True:
+            if client.is_connected():
+                with open(path, "a"):
+                    os.utime(path)
+            time.sleep(interval)
+
+    threading.Thread(target=beat, name="taskpilot-heartbeat", daemon=True).start()
@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+TASK_STORE_PATH = os.getenv('TASKPILOT_TASK_STORE_PATH', '.taskpilot_tasks.sqlite3')
+FOLLOW_UP_DELAY = int(os.getenv('TASKPILOT_FOLLOW_UP_DELAY', '86400'))  # seconds after the due time, 0 = none
+REMINDER_HOUR = int(os.getenv('TASKPILOT_REMINDER_HOUR', '9'))  # for due dates without a time
+# A task due sooner than this after it is sent gets no reminder: the
+# message itself is the reminder
+REMINDER_MIN_LEAD = int(os.getenv('TASKPILOT_REMINDER_MIN_LEAD', '300'))  # seconds
+
+# Task lifecycle: pending -> reminded, or pending -> awaiting_response ->
+# followed_up when a response is required. A task already due when sent
+# starts at awaiting_response (or pending with nothing scheduled). A reply
+# in the task's thread marks it done at any point.
+
+def due_timestamp(due_date):
+    """
+    Convert a parsed due_date (ISO format) to a Unix timestamp; dates
+    without a time fall at REMINDER_HOUR local time
+    """
+    due = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
+    if len(due_date) <= 10:
+        due = due.replace(hour=REMINDER_HOUR)
+    return due.timestamp()
+
+class TaskStore:
+    """
+    Durable store of sent tasks and their reminder state
+
+    SQLite in WAL mode so several processes can share it. next_at is when
+    the scheduler must next act on a task (NULL once nothing is left to
+    do); a partial index on it keeps the scheduler's range scans
+    proportional to the tasks it loads, not to the table.
+    """
+
+    def __init__(self, path=TASK_STORE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                recipient TEXT NOT NULL,
+                recipient_id TEXT,
+                task TEXT NOT NULL,
+                due_at REAL NOT NULL,
+                response_required INTEGER NOT NULL,
+                output TEXT,
+                channel TEXT,
+                message_ts TEXT,
+                status TEXT NOT NULL,
+                next_at REAL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_status_due ON tasks (status, due_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_recipient ON tasks (recipient_id, status)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_message ON tasks (message_ts)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_next ON tasks (next_at, id) WHERE next_at IS NOT NULL")
+
+    def add(self, parsed_task, channel, message_ts, recipient_id=None):
+        """
+        Record a sent task and return (id, next_at); next_at is None when
+        there is nothing to schedule. A task due within REMINDER_MIN_LEAD
+        of now (or already overdue) skips its reminder.
+        """
+        now = time.time()
+        due_at = due_timestamp(parsed_task['due_date'])
+        response_required = bool(parsed_task.get('response_required'))
+        status, next_at = 'pending', due_at
+        if due_at < now + REMINDER_MIN_LEAD:
+            next_at = due_at + FOLLOW_UP_DELAY if response_required and FOLLOW_UP_DELAY else None
+            if next_at is not None and next_at <= now:
+                next_at = None
+            if next_at is not None:
+                status = 'awaiting_response'
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO tasks (recipient, recipient_id, task, due_at, response_required, output,"
+                " channel, message_ts, status, next_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (parsed_task['recipient'], recipient_id, parsed_task['task'], due_at,
+                 int(response_required), parsed_task.get('output'),
+                 channel, message_ts, status, next_at, now)
+            )
+            return cursor.lastrowid, next_at
+
+    def get(self, task_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_message(self, message_ts, recipient_id):
+        """
+        Return recipient_id's task posted as message_ts (a digest message
+        holds several), preferring open tasks. Tasks whose recipient was
+        never resolved to a member match nobody.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM tasks WHERE message_ts = ? AND recipient_id = ?"
+                " ORDER BY next_at IS NULL, id LIMIT 1",
+                (message_ts, recipient_id)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def is_task_message(self, message_ts):
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM tasks WHERE message_ts = ? LIMIT 1", (message_ts,)
+            ).fetchone() is not None
+
+    def scheduled(self, after, until, limit):
+        """
+        Return up to limit (next_at, id) pairs after the (next_at, id) key
+        after and no later than until, in order
+        """
+        after_at, after_id = after
+        with self._lock:
+            return [tuple(row) for row in self._db.execute(
+                "SELECT next_at, id FROM tasks WHERE next_at IS NOT NULL AND next_at <= ?"
+                " AND (next_at > ? OR (next_at = ? AND id > ?)) ORDER BY next_at, id LIMIT ?",
+                (until, after_at, after_at, after_id, limit)
+            )]
+
+    def added_since(self, last_id, until):
+        """
+        Return (next_at, id) for tasks added after last_id (possibly by
+        another process) that are due by until, and the highest id seen
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT next_at, id FROM tasks WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+        if not rows:
+            return [], last_id
+        return [(at, task_id) for at, task_id in rows if at is not None and at <= until], rows[-1][1]
+
+    def max_id(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+
+    def claim(self, task_id, expected_at, status, next_at):
+        """
+        Move a task to status/next_at if it is still scheduled at
+        expected_at. Returns False if another process got there first or
+        the task was completed.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE tasks SET status = ?, next_at = ? WHERE id = ? AND next_at = ?",
+                (status, next_at, task_id, expected_at)
+            )
+            return cursor.rowcount == 1
+
+    def reschedule(self, task_id, status, next_at):
+        with self._lock:
+            self._db.execute("UPDATE tasks SET status = ?, next_at = ? WHERE id = ?", (status, next_at, task_id))
+
+    def complete(self, task_id):
+        with self._lock:
+            self._db.execute("UPDATE tasks SET status = 'done', next_at = NULL WHERE id = ?", (task_id,))
+
+    def counts(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_task_store():
+    """
+    Return the process-wide task store, or None when
+    TASKPILOT_TASK_STORE_PATH is empty
+    """
+    global _store
+    with _store_lock:
+        if _store is None and TASK_STORE_PATH:
+            _store = TaskStore(TASK_STORE_PATH)
+        return _store
@@ -0,0 +1,90 @@
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+def make_breaker(**overrides):
+    settings = dict(window=60, min_calls=4, error_rate=0.5, p99=1.0, cooldown=0, probes=2)
+    settings.update(overrides)
+    return CircuitBreaker("test", **settings)
+
+def test_stays_closed_until_min_calls():
+    breaker = make_breaker()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+
+def test_opens_at_error_rate():
+    breaker = make_breaker(cooldown=60)
+    for ok in (True, False, True, False):
+        breaker.record(ok, 0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+def test_below_error_rate_stays_closed():
+    breaker = make_breaker()
+    for ok in (True, True, True, False):
+        breaker.record(ok, 0.1)
+    assert breaker.state == CLOSED
+
+def test_opens_on_slow_p99():
+    breaker = make_breaker(cooldown=60)
+    for latency in (0.1, 0.1, 0.1, 5.0):
+        breaker.record(True, latency)
+    assert breaker.state == OPEN
+
+def test_calls_without_latency_do_not_count_towards_p99():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(True)
+    breaker.record(True, 5.0)
+    assert breaker.state == CLOSED
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+def test_half_open_lets_one_probe_through_at_a_time():
+    breaker = make_breaker()
+    trip(breaker)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.allow()
+
+def test_successful_probes_close():
+    breaker = make_breaker()
+    trip(breaker)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    # The failures that opened it are forgotten
+    breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    trip(breaker)
+    assert breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+def test_slow_probe_reopens():
+    breaker = make_breaker()
+    trip(breaker)
+    assert breaker.allow()
+    breaker.record(True, 5.0)
+    assert breaker.state == OPEN
+
+def test_open_waits_for_cooldown():
+    breaker = make_breaker(cooldown=60)
+    trip(breaker)
+    assert not breaker.allow()
+    assert breaker.state == OPEN
+
+def test_outcomes_recorded_while_open_are_ignored():
+    breaker = make_breaker(cooldown=60)
+    trip(breaker)
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN
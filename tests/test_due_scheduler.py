@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import task_store
+from due_scheduler import DueScheduler
+from task_store import TaskStore, due_timestamp
+
+def task(due_date, response_required=False):
+    return {"recipient": "Sarah", "task": "send the draft", "due_date": due_date,
+            "response_required": response_required, "output": "confirmation"}
+
+def later(seconds):
+    return (datetime.now() + timedelta(seconds=seconds)).isoformat()
+
+@pytest.fixture
+def store(tmp_path):
+    return TaskStore(str(tmp_path / "tasks.sqlite3"))
+
+class Recorder:
+    def __init__(self, fail=False):
+        self.fired = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def __call__(self, task, kind):
+        with self._lock:
+            self.fired.append((task["id"], kind))
+        if self.fail:
+            raise RuntimeError("Slack is down")
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+def make_due(store, task_id):
+    # Bring a stored task's reminder forward to now
+    now = time.time()
+    store.reschedule(task_id, "pending", now)
+    return now
+
+def test_date_only_due_dates_fall_at_reminder_hour():
+    due = datetime.fromtimestamp(due_timestamp("2026-10-16"))
+    assert (due.date().isoformat(), due.hour, due.minute) == ("2026-10-16", task_store.REMINDER_HOUR, 0)
+
+def test_future_task_is_scheduled_at_its_due_time(store):
+    due_date = later(3600)
+    task_id, next_at = store.add(task(due_date), "C1", "1.0", "U1")
+    assert next_at == due_timestamp(due_date)
+    assert store.get(task_id)["status"] == "pending"
+
+@pytest.mark.parametrize("due_date", [later(5), later(-3600), datetime.now().date().isoformat()])
+def test_no_reminder_for_a_task_due_when_sent(store, monkeypatch, due_date):
+    monkeypatch.setattr(task_store, "REMINDER_HOUR", 0)
+    task_id, next_at = store.add(task(due_date), "C1", "1.0", "U1")
+    assert next_at is None
+    assert store.get(task_id)["next_at"] is None
+
+def test_task_due_when_sent_still_gets_its_follow_up(store):
+    due_date = later(-60)
+    task_id, next_at = store.add(task(due_date, response_required=True), "C1", "1.0", "U1")
+    assert next_at == due_timestamp(due_date) + task_store.FOLLOW_UP_DELAY
+    assert store.get(task_id)["status"] == "awaiting_response"
+
+def test_fires_reminder_once(store):
+    task_id, _ = store.add(task(later(3600)), "C1", "1.0", "U1")
+    make_due(store, task_id)
+    fire = Recorder()
+    scheduler = DueScheduler(store, fire).start()
+    wait_for(lambda: fire.fired)
+    time.sleep(0.1)
+    scheduler.stop()
+    assert fire.fired == [(task_id, "reminder")]
+    assert store.get(task_id)["status"] == "reminded"
+    assert store.get(task_id)["next_at"] is None
+
+def test_reminder_then_follow_up_when_a_response_is_required(store):
+    task_id, _ = store.add(task(later(3600), response_required=True), "C1", "1.0", "U1")
+    due_at = store.get(task_id)["due_at"]
+    make_due(store, task_id)
+    fire = Recorder()
+    scheduler = DueScheduler(store, fire).start()
+    wait_for(lambda: fire.fired)
+    row = store.get(task_id)
+    assert (row["status"], row["next_at"]) == ("awaiting_response", due_at + task_store.FOLLOW_UP_DELAY)
+
+    store.reschedule(task_id, "awaiting_response", time.time())
+    scheduler.schedule(task_id, store.get(task_id)["next_at"])
+    wait_for(lambda: len(fire.fired) == 2)
+    scheduler.stop()
+    assert fire.fired == [(task_id, "reminder"), (task_id, "follow_up")]
+    assert store.get(task_id)["status"] == "followed_up"
+
+def test_completed_task_does_not_fire(store):
+    task_id, _ = store.add(task(later(3600)), "C1", "1.0", "U1")
+    make_due(store, task_id)
+    store.complete(task_id)
+    fire = Recorder()
+    scheduler = DueScheduler(store, fire).start()
+    time.sleep(0.2)
+    scheduler.stop()
+    assert fire.fired == []
+
+def test_processes_sharing_a_store_fire_each_task_once(store, tmp_path):
+    task_ids = [store.add(task(later(3600)), "C1", f"{i}.0", "U1")[0] for i in range(20)]
+    for task_id in task_ids:
+        make_due(store, task_id)
+    fire = Recorder()
+    # Each scheduler with its own connection, as separate processes would have
+    schedulers = [DueScheduler(TaskStore(str(tmp_path / "tasks.sqlite3")), fire).start() for _ in range(3)]
+    wait_for(lambda: len(fire.fired) >= len(task_ids))
+    time.sleep(0.2)
+    for scheduler in schedulers:
+        scheduler.stop()
+    assert sorted(fire.fired) == sorted((task_id, "reminder") for task_id in task_ids)
+
+def test_failed_reminder_is_retried_later(store):
+    task_id, _ = store.add(task(later(3600)), "C1", "1.0", "U1")
+    make_due(store, task_id)
+    fire = Recorder(fail=True)
+    scheduler = DueScheduler(store, fire).start()
+    wait_for(lambda: fire.fired)
+    scheduler.stop()
+    row = store.get(task_id)
+    assert row["status"] == "pending"
+    assert row["next_at"] > time.time()
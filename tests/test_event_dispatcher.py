@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from event_dispatcher import EventDispatcher
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+class BlockingHandler:
+    """
+    Records events; holds the worker on the first one until released
+    """
+
+    def __init__(self):
+        self.handled = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, event):
+        self.started.set()
+        self.release.wait(5)
+        self.handled.append(event)
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        EventDispatcher(lambda event: None, policy="drop")
+
+def test_events_of_a_channel_keep_their_order():
+    handled = []
+    lock = threading.Lock()
+
+    def handler(event):
+        time.sleep(0.001)
+        with lock:
+            handled.append(event)
+
+    dispatcher = EventDispatcher(handler, workers=4, queue_size=400, policy="block").start()
+    events = [{"channel": f"C{i % 5}", "n": i} for i in range(100)]
+    for event in events:
+        assert dispatcher.submit(event)
+    dispatcher.shutdown()
+    assert len(handled) == 100
+    for channel in {event["channel"] for event in events}:
+        assert [e["n"] for e in handled if e["channel"] == channel] == [
+            e["n"] for e in events if e["channel"] == channel]
+
+def fill(dispatcher, handler):
+    # One event being handled, one waiting in the queue of size one
+    assert dispatcher.submit({"channel": "C1", "n": 0})
+    handler.started.wait(5)
+    assert dispatcher.submit({"channel": "C1", "n": 1})
+    assert dispatcher.queue_depth() == 1
+
+def test_shed_drops_events_when_full():
+    handler = BlockingHandler()
+    dispatcher = EventDispatcher(handler, workers=1, queue_size=1, policy="shed").start()
+    fill(dispatcher, handler)
+    assert not dispatcher.submit({"channel": "C1", "n": 2})
+    assert dispatcher.shed_count == 1
+    handler.release.set()
+    dispatcher.shutdown()
+    assert [event["n"] for event in handler.handled] == [0, 1]
+
+def test_busy_replies_once_per_channel():
+    handler = BlockingHandler()
+    busy = BlockingHandler()
+    dispatcher = EventDispatcher(handler, workers=1, queue_size=1, policy="busy", on_busy=busy).start()
+    fill(dispatcher, handler)
+    assert not dispatcher.submit({"channel": "C1", "n": 2})
+    # The first busy reply is being sent; the rest of the burst leaves one pending
+    busy.started.wait(5)
+    for n in range(3, 7):
+        assert not dispatcher.submit({"channel": "C1", "n": n})
+    assert not dispatcher.submit({"channel": "C2", "n": 7})
+    busy.release.set()
+    wait_for(lambda: len(busy.handled) >= 3)
+    handler.release.set()
+    dispatcher.shutdown()
+    assert dispatcher.shed_count == 6
+    assert [(event["channel"], event["n"]) for event in busy.handled] == [("C1", 2), ("C1", 3), ("C2", 7)]
+
+def test_block_waits_for_room():
+    handler = BlockingHandler()
+    dispatcher = EventDispatcher(handler, workers=1, queue_size=1, policy="block").start()
+    fill(dispatcher, handler)
+    submitted = threading.Event()
+
+    def submit():
+        dispatcher.submit({"channel": "C1", "n": 2})
+        submitted.set()
+
+    threading.Thread(target=submit, daemon=True).start()
+    assert not submitted.wait(0.1)
+    handler.release.set()
+    assert submitted.wait(5)
+    dispatcher.shutdown()
+    assert [event["n"] for event in handler.handled] == [0, 1, 2]
+    assert dispatcher.shed_count == 0
+
+def test_shutdown_without_drain_discards_queued_events():
+    handler = BlockingHandler()
+    dispatcher = EventDispatcher(handler, workers=1, queue_size=1, policy="shed").start()
+    fill(dispatcher, handler)
+    threading.Timer(0.05, handler.release.set).start()
+    dispatcher.shutdown(drain=False)
+    assert [event["n"] for event in handler.handled] == [0]
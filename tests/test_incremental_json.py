@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from incremental_json import IncrementalJSONObject
+
+def feed_all(fragments):
+    parser = IncrementalJSONObject()
+    members = []
+    for fragment in fragments:
+        members.append(parser.feed(fragment))
+    return parser, members
+
+def test_members_arrive_as_soon_as_complete():
+    parser, members = feed_all(['{"recipient": "Sa', 'rah", "task', '": "send the draft"}'])
+    assert members == [[], [("recipient", "Sarah")], [("task", "send the draft")]]
+    assert parser.done
+    assert parser.result() == {"recipient": "Sarah", "task": "send the draft"}
+
+def test_number_split_across_fragments_waits_for_the_rest():
+    parser, members = feed_all(['{"n": 12', '.5', '}'])
+    assert members == [[], [], [("n", 12.5)]]
+
+def test_literals_and_nested_values():
+    parser, _ = feed_all(['{"ok": tr', 'ue, "none": null, "list": [1, ', '2], "obj": {"a": "}"}}'])
+    assert parser.result() == {"ok": True, "none": None, "list": [1, 2], "obj": {"a": "}"}}
+
+def test_escaped_quotes_and_commas_inside_strings():
+    text = json.dumps({"task": 'say "hi", then \\ leave', "due_date": "2026-10-16"})
+    parser, _ = feed_all([text[:12], text[12:20], text[20:]])
+    assert parser.result() == json.loads(text)
+
+def test_char_by_char_matches_json_loads():
+    text = '  {\n "recipient" : "Alex",\n "response_required": false, "count": -3e2 }  '
+    parser, _ = feed_all(list(text))
+    assert parser.result() == json.loads(text)
+
+def test_incomplete_object_raises_on_result():
+    parser, _ = feed_all(['{"recipient": "Alex", "task": "rev'])
+    assert parser.values == {"recipient": "Alex"}
+    with pytest.raises(ValueError):
+        parser.result()
+
+def test_non_object_is_rejected():
+    with pytest.raises(ValueError):
+        IncrementalJSONObject().feed('["not", "an", "object"]')
+
+def test_text_after_the_object_is_ignored():
+    parser, members = feed_all(['{"a": 1}', ' trailing'])
+    assert parser.result() == {"a": 1}
+    assert members[1] == []
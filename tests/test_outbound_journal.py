@@ -0,0 +1,120 @@
+import sqlite3
+import time
+
+import pytest
+
+import outbound_journal
+from outbound_journal import INFLIGHT_LEASE, OutboundJournal, OutboxRetrier
+
+TASK = {"recipient": "Sarah", "task": "send the draft", "due_date": "2026-10-16"}
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "outbox.sqlite3")
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(outbound_journal, "OUTBOX_RETRY_BASE", 0)
+
+def stop_heartbeat(path, journal):
+    # As if the process holding the journal had died
+    with sqlite3.connect(path) as db:
+        db.execute("UPDATE owners SET seen_at = ? WHERE owner = ?", (time.time() - 2 * INFLIGHT_LEASE, journal.owner))
+
+def test_appended_entry_is_held_by_its_process(path):
+    journal = OutboundJournal(path)
+    entry = journal.append(TASK, "C1")
+    assert entry["uncertain"] and entry["parsed"] == TASK
+    assert journal.counts() == {"inflight": 1}
+    assert journal.claim_due() == []
+    # Another live process leaves it alone however long it waits
+    assert OutboundJournal(path).claim_due() == []
+
+def test_entries_of_a_dead_process_are_taken_over_as_uncertain(path, no_backoff):
+    dead = OutboundJournal(path)
+    entry = dead.append(TASK, "C1")
+    dead.mark_failed(entry["id"], "timeout", uncertain=False)
+    [claimed] = dead.claim_due()
+    stop_heartbeat(path, dead)
+
+    survivor = OutboundJournal(path)
+    [taken] = survivor.claim_due()
+    assert taken["id"] == claimed["id"]
+    assert taken["uncertain"]
+    # Claimed once only
+    assert survivor.claim_due() == []
+    assert OutboundJournal(path).claim_due() == []
+
+def test_failed_entry_is_retried_after_backoff(path, monkeypatch):
+    journal = OutboundJournal(path)
+    entry = journal.append(TASK, "C1")
+    next_attempt_at = journal.mark_failed(entry["id"], "rate_limited")
+    assert time.time() < next_attempt_at <= time.time() + outbound_journal.OUTBOX_RETRY_BASE
+    assert journal.counts() == {"pending": 1}
+    assert journal.claim_due() == []
+
+    monkeypatch.setattr(outbound_journal, "OUTBOX_RETRY_BASE", 0)
+    journal.mark_failed(journal.append(TASK, "C2")["id"], "rate_limited")
+    claimed = journal.claim_due()
+    assert [entry["channel"] for entry in claimed] == ["C2"]
+    assert claimed[0]["attempts"] == 1
+    assert claimed[0]["attempted_at"] is not None
+    assert not claimed[0]["uncertain"]
+
+def test_backoff_doubles(path, monkeypatch):
+    monkeypatch.setattr(outbound_journal, "OUTBOX_RETRY_BASE", 100)
+    journal = OutboundJournal(path)
+    entry = journal.append(TASK, "C1")
+    delays = []
+    for _ in range(3):
+        start = time.time()
+        delays.append(journal.mark_failed(entry["id"], "error") - start)
+        # Hand it back to this process as if the retrier had claimed it
+        with sqlite3.connect(path) as db:
+            db.execute("UPDATE outbox SET status = 'inflight' WHERE id = ?", (entry["id"],))
+    assert 50 <= delays[0] <= 100
+    assert 100 <= delays[1] <= 200
+    assert 200 <= delays[2] <= 400
+
+def test_gives_up_after_max_attempts(path, monkeypatch, no_backoff):
+    monkeypatch.setattr(outbound_journal, "OUTBOX_MAX_ATTEMPTS", 2)
+    journal = OutboundJournal(path)
+    entry = journal.append(TASK, "C1")
+    assert journal.mark_failed(entry["id"], "error") is not None
+    journal.claim_due()
+    assert journal.mark_failed(entry["id"], "error") is None
+    assert journal.counts() == {"failed": 1}
+    assert journal.claim_due() == []
+
+def test_sent_entries_are_not_retried(path, no_backoff):
+    journal = OutboundJournal(path)
+    entries = [journal.append(TASK, "C1") for _ in range(2)]
+    journal.mark_sent([entry["id"] for entry in entries], "1700000000.000100")
+    assert journal.counts() == {"sent": 2}
+    stop_heartbeat(path, journal)
+    assert OutboundJournal(path).claim_due() == []
+
+def test_thread_is_kept_with_the_entry(path, no_backoff):
+    journal = OutboundJournal(path)
+    entry = journal.append(TASK, "general")
+    journal.set_thread([entry["id"]], "C1", "1700000000.000100")
+    journal.mark_failed(entry["id"], "error")
+    [claimed] = journal.claim_due()
+    assert (claimed["channel"], claimed["thread_ts"]) == ("C1", "1700000000.000100")
+
+def test_retrier_hands_back_entries_whose_delivery_raised(path, no_backoff):
+    journal = OutboundJournal(path)
+    journal.mark_failed(journal.append(TASK, "C1")["id"], "error")
+    delivered = []
+
+    def deliver(entry):
+        delivered.append(entry["id"])
+        raise RuntimeError("boom")
+
+    retrier = OutboxRetrier(journal, deliver, interval=0.05).start()
+    deadline = time.time() + 5
+    while len(delivered) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    retrier.stop()
+    # Retried again rather than held in flight for good
+    assert len(delivered) >= 2
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pytest
+
+from llm_parser import TIER_THRESHOLD, parse_with_stub, parse_with_stub_batch, parse_with_stub_scored
+
+# A Wednesday
+NOW = datetime(2026, 10, 14, 15, 30)
+
+def parse(text):
+    return parse_with_stub_scored(text, NOW)
+
+def test_clear_instruction_is_parsed_and_confident():
+    parsed, confidence = parse("Remind Sarah to send the draft by Friday")
+    assert parsed == {
+        "recipient": "Sarah",
+        "task": "send the draft",
+        "due_date": "2026-10-16",
+        "response_required": False,
+        "output": "confirmation",
+    }
+    assert all(score >= TIER_THRESHOLD for score in confidence.values())
+
+@pytest.mark.parametrize("text, due_date", [
+    ("Ask Alex to review the doc today", "2026-10-14"),
+    ("Ask Alex to review the doc tomorrow", "2026-10-15"),
+    ("Ask Alex to review the doc on Monday", "2026-10-19"),
+    ("Ask Alex to review the doc on Wednesday", "2026-10-14"),
+    ("Ask Alex to review the doc next Monday", "2026-10-26"),
+    ("Ask Alex to review the doc", "2026-10-15"),
+])
+def test_due_dates_are_date_only(text, due_date):
+    assert parse(text)[0]["due_date"] == due_date
+
+@pytest.mark.parametrize("text, task", [
+    ("remind sarah to send the draft by friday", "send the draft"),
+    ("Tell Priya to book the room for next Tuesday", "book the room"),
+    ("Please remind Wei to check the Q3 report, by tomorrow", "check the Q3 report"),
+    ("Remind John to call the client", "call the client"),
+])
+def test_task_text_is_trimmed_and_keeps_its_case(text, task):
+    assert parse(text)[0]["task"] == task
+
+def test_task_cut_mid_phrase_is_not_confident():
+    parsed, confidence = parse("Remind Maria to meet with the team at Friday")
+    assert parsed["task"] == "meet with the team at"
+    assert confidence["task"] < TIER_THRESHOLD
+
+def test_no_recipient():
+    parsed, confidence = parse("Send the draft by Friday")
+    assert parsed["recipient"] == "Unknown"
+    assert confidence["recipient"] < TIER_THRESHOLD
+
+@pytest.mark.parametrize("text", [
+    "Remind me to send the draft by Friday",
+    "Remind Sarah and Alex to send the draft by Friday",
+    "Remind Sarah Connor to send the draft by Friday",
+])
+def test_doubtful_recipients_are_not_confident(text):
+    assert parse(text)[1]["recipient"] < TIER_THRESHOLD
+
+def test_response_request_after_the_date():
+    parsed, confidence = parse("Remind Alex to review Q3 numbers Friday and summarize")
+    assert parsed["response_required"] and parsed["output"] == "summary"
+    assert confidence["response_required"] >= TIER_THRESHOLD
+    assert confidence["output"] >= TIER_THRESHOLD
+
+def test_response_word_inside_the_task_is_doubtful():
+    parsed, confidence = parse("Ask Alex to reply to the customer by Friday")
+    assert parsed["response_required"]
+    assert confidence["response_required"] < TIER_THRESHOLD
+
+@pytest.mark.parametrize("text", ["Remind Alex to replace the battery Friday", "Tell Sam he is responsible Friday"])
+def test_words_that_only_start_like_response_words(text):
+    assert not parse(text)[0]["response_required"]
+
+def test_unreadable_date_is_not_confident():
+    parsed, confidence = parse("Remind Sarah to send the draft by end of March")
+    assert confidence["due_date"] < TIER_THRESHOLD
+
+def test_unscored_and_batch_parses_match_the_scored_parse():
+    texts = [
+        "Remind Sarah to send the draft by Friday",
+        "Tell Priya to book the room for next Tuesday and confirm",
+        "Send the draft",
+    ]
+    expected = [parse(text)[0] for text in texts]
+    assert [parse_with_stub(text, NOW) for text in texts] == expected
+    assert parse_with_stub_batch(texts, NOW) == expected
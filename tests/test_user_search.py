@@ -0,0 +1,75 @@
+import pytest
+
+from user_search import MIN_SUGGESTION_SCORE, UserSearchIndex, normalize
+
+def member(user_id, real_name, display_name="", handle="", email="", **extra):
+    user = {"id": user_id, "name": handle, "profile": {"real_name": real_name, "display_name": display_name}}
+    if email:
+        user["profile"]["email"] = email
+    user.update(extra)
+    return user
+
+MEMBERS = [
+    member("U1", "Sarah Connor", "sarah", "sconnor"),
+    member("U2", "Alex Kingsley", "", "akingsley"),
+    member("U3", "Samuel Jackson", "", "sjackson"),
+    member("U4", "Priya Patel", "", "ppatel", email="priya.patel@example.com"),
+    member("U5", "Meredith Grey", "", "mgrey"),
+    member("U6", "Bot User", "", "bot", is_bot=True),
+    member("U7", "Gone Person", "", "gone", deleted=True),
+]
+
+@pytest.fixture
+def index():
+    index = UserSearchIndex()
+    index.build(MEMBERS)
+    return index
+
+def test_normalize_strips_punctuation():
+    assert normalize("  Alex K. ") == "alex k"
+
+def test_exact_name_resolves(index):
+    assert index.resolve("Sarah Connor")[0] == "U1"
+
+def test_prefix_of_full_name_resolves(index):
+    assert index.resolve("alex k")[0] == "U2"
+
+def test_nickname_resolves(index):
+    assert index.resolve("Sam")[0] == "U3"
+
+def test_misspelling_is_found_by_trigrams(index):
+    assert index.search("Meridith")[0][1] == "U5"
+
+def test_bots_and_deleted_members_are_not_indexed(index):
+    assert len(index) == 5
+    found = {user_id for query in ("Bot User", "Gone Person") for _, user_id in index.search(query)}
+    assert not found & {"U6", "U7"}
+
+def test_two_close_matches_are_ambiguous():
+    index = UserSearchIndex()
+    index.build([member("U1", "Alex Kingsley"), member("U2", "Alex Kowalski")])
+    user_id, candidates = index.resolve("Alex")
+    assert user_id is None
+    assert {candidate for _, candidate in candidates} == {"U1", "U2"}
+
+def test_add_and_remove_keep_the_index_current(index):
+    index.add(member("U8", "Wei Chen"))
+    assert index.resolve("Wei Chen")[0] == "U8"
+    index.add(member("U8", "Wei Zhang"))
+    assert index.resolve("Wei Chen")[0] is None
+    assert index.resolve("Wei Zhang")[0] == "U8"
+    index.remove("U8")
+    assert index.search("Wei Zhang") == []
+
+@pytest.mark.parametrize("placeholder", ["Unknown", "me", "them", "everyone", "The team"])
+def test_no_suggestions_for_placeholders(index, placeholder):
+    assert index.suggest(placeholder) == []
+
+def test_no_suggestions_for_unrelated_text(index):
+    assert index.suggest("zzzz") == []
+    assert index.suggest("Xavier") == []
+
+def test_suggestions_are_plausible_and_ranked(index):
+    suggestions = index.suggest("Sara")
+    assert suggestions[0][1] == "U1"
+    assert all(score >= MIN_SUGGESTION_SCORE for score, _ in suggestions)
@@ -0,0 +1,294 @@
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from functools import lru_cache
+
+# Score a match must reach to be used, and how close the runner-up may be
+# before the match is treated as ambiguous
+MIN_CONFIDENCE = 0.75
+AMBIGUITY_MARGIN = 0.05
+# Score a member must reach to be offered as a suggestion at all
+MIN_SUGGESTION_SCORE = 0.6 * MIN_CONFIDENCE
+
+# Recipients that stand for nobody in particular (the stub's "Unknown",
+# pronouns, groups); they get no suggestions
+PLACEHOLDER_NAMES = {"unknown", "me", "him", "her", "them", "us", "you", "everyone", "everybody",
+                     "someone", "somebody", "anyone", "all", "team", "the team"}
+
+# Trigram postings longer than this are too common to narrow the search
+MAX_TRIGRAM_POSTING = 1000
+MAX_PREFIX_MATCHES = 1000
+MAX_CANDIDATES = 50
+MAX_FUZZY_CANDIDATES = 20
+
+# Field weights: a hit on the handle or email is slightly weaker evidence
+FIELD_WEIGHTS = {"display_name": 1.0, "real_name": 1.0, "handle": 0.95, "email": 0.9}
+
+NICKNAME_GROUPS = [
+    ("alex", "alexander", "alexandra", "alexis"),
+    ("sam", "samuel", "samantha"),
+    ("bob", "rob", "robert", "bobby", "robbie"),
+    ("bill", "will", "william", "billy", "liam"),
+    ("liz", "beth", "elizabeth", "eliza", "lizzie"),
+    ("kate", "katie", "katherine", "catherine", "kathy", "cathy"),
+    ("mike", "michael", "mick", "mikey"),
+    ("jim", "jimmy", "james", "jamie"),
+    ("joe", "joseph", "joey"),
+    ("dan", "daniel", "danny"),
+    ("dave", "david", "davey"),
+    ("chris", "christopher", "christine", "christina"),
+    ("matt", "matthew"),
+    ("nick", "nicholas", "nicole", "nicky"),
+    ("tom", "thomas", "tommy"),
+    ("tony", "anthony"),
+    ("jen", "jenny", "jennifer"),
+    ("sara", "sarah"),
+    ("steve", "steven", "stephen"),
+    ("ben", "benjamin"),
+    ("andy", "andrew", "drew"),
+    ("pat", "patrick", "patricia"),
+    ("ed", "eddie", "edward"),
+    ("rick", "richard", "rich", "dick"),
+    ("meg", "megan", "margaret", "maggie", "peggy"),
+]
+NICKNAMES = {}
+for _group in NICKNAME_GROUPS:
+    for _name in _group:
+        NICKNAMES.setdefault(_name, set()).update(n for n in _group if n != _name)
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPLIT_HANDLE = re.compile(r"[._\-]+")
+
+def normalize(text):
+    """
+    Lowercase text and reduce punctuation to spaces ("Alex K." -> "alex k")
+    """
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+def trigrams(token):
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _user_fields(user):
+    profile = user.get('profile', {})
+    email = profile.get('email', '') or ''
+    fields = {
+        "display_name": profile.get('display_name', ''),
+        "real_name": profile.get('real_name', ''),
+        "handle": _SPLIT_HANDLE.sub(" ", user.get('name', '') or ''),
+        "email": _SPLIT_HANDLE.sub(" ", email.split('@')[0]),
+    }
+    result = []
+    for field, value in fields.items():
+        value = normalize(value)
+        if value:
+            result.append((FIELD_WEIGHTS[field], value, value.split()))
+    return result
+
+class UserSearchIndex:
+    """
+    Fuzzy member search over display name, real name, handle and email
+
+    Four indexes narrow the candidates without scanning the directory:
+    exact full-name strings, sorted name and token lists searched by prefix
+    with bisect ("alex k" -> "alex kingsley"), and trigram postings for
+    typos. Only the narrowed candidates are scored, so lookups stay well
+    under a millisecond on large workspaces.
+    """
+
+    def __init__(self):
+        self._fields = {}     # user id -> [(weight, normalized value, tokens)]
+        self._token_text = {} # user id -> " token token ... " for substring checks
+        self._exact = {}      # normalized value -> [user ids]
+        self._values = []     # sorted (normalized value, user id)
+        self._tokens = []     # sorted (token, user id)
+        self._trigrams = {}   # trigram -> [user ids]
+
+    def __len__(self):
+        return len(self._fields)
+
+    def build(self, users):
+        """
+        Rebuild the index from a full member list
+        """
+        self.__init__()
+        values, tokens = [], []
+        for user in users:
+            user_values, user_tokens = self._add_fields(user)
+            values.extend(user_values)
+            tokens.extend(user_tokens)
+        self._values = sorted(values)
+        self._tokens = sorted(tokens)
+
+    def add(self, user):
+        self.remove(user['id'])
+        values, tokens = self._add_fields(user)
+        for entry in values:
+            insort(self._values, entry)
+        for entry in tokens:
+            insort(self._tokens, entry)
+
+    def remove(self, user_id):
+        fields = self._fields.pop(user_id, None)
+        if not fields:
+            return
+        del self._token_text[user_id]
+        for _, value, tokens in fields:
+            self._discard(self._exact, value, user_id)
+            _remove_sorted(self._values, (value, user_id))
+            for token in tokens:
+                _remove_sorted(self._tokens, (token, user_id))
+                for gram in trigrams(token):
+                    self._discard(self._trigrams, gram, user_id)
+
+    def search(self, query, limit=5):
+        """
+        Return up to limit (score, user id) pairs, best first
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        query_tokens = query.split()
+
+        scored = [
+            (self._score(query, query_tokens, user_id), user_id)
+            for user_id in self._candidates(query, query_tokens)
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:limit]
+
+    def suggest(self, query, limit=3):
+        """
+        Return up to limit (score, user id) pairs worth offering for a
+        query that didn't resolve, best first; none for placeholders
+        """
+        if normalize(query) in PLACEHOLDER_NAMES:
+            return []
+        return [(score, user_id) for score, user_id in self.search(query, limit) if score >= MIN_SUGGESTION_SCORE]
+
+    def resolve(self, query):
+        """
+        Return (user id, candidates): the confident, unambiguous match or
+        None, plus the ranked candidates for disambiguation
+        """
+        results = self.search(query)
+        if not results or results[0][0] < MIN_CONFIDENCE:
+            return None, results
+        if len(results) > 1 and results[1][0] >= results[0][0] - AMBIGUITY_MARGIN:
+            return None, results
+        return results[0][1], results
+
+    def _add_fields(self, user):
+        if user.get('is_bot') or user.get('deleted'):
+            return [], []
+        user_id = user['id']
+        fields = _user_fields(user)
+        self._fields[user_id] = fields
+        values = set()
+        entries = set()
+        for _, value, tokens in fields:
+            self._exact.setdefault(value, [])
+            if user_id not in self._exact[value]:
+                self._exact[value].append(user_id)
+            values.add((value, user_id))
+            for token in tokens:
+                entries.add((token, user_id))
+        self._token_text[user_id] = " " + " ".join(token for token, _ in entries) + " "
+        for token, _ in entries:
+            for gram in trigrams(token):
+                posting = self._trigrams.setdefault(gram, [])
+                if not posting or posting[-1] != user_id:
+                    posting.append(user_id)
+        return list(values), list(entries)
+
+    def _discard(self, index, key, user_id):
+        posting = index.get(key)
+        if posting and user_id in posting:
+            posting.remove(user_id)
+            if not posting:
+                del index[key]
+
+    def _prefix_matches(self, entries, prefix, cap):
+        # Exact matches sort first, so they survive the cap
+        ids = {}
+        i = bisect_left(entries, (prefix, ""))
+        while i < len(entries) and entries[i][0].startswith(prefix):
+            ids.setdefault(entries[i][1])
+            if len(ids) >= cap:
+                break
+            i += 1
+        return list(ids)
+
+    def _has_token(self, user_id, query_token):
+        text = self._token_text[user_id]
+        if f" {query_token}" in text:
+            return True
+        return any(f" {nickname} " in text for nickname in NICKNAMES.get(query_token, ()))
+
+    def _candidates(self, query, query_tokens):
+        exact = self._exact.get(query)
+        if exact:
+            return exact[:MAX_CANDIDATES]
+
+        # The query as the start of a full name ("alex k" -> "alex kingsley")
+        candidates = self._prefix_matches(self._values, query, MAX_CANDIDATES)
+        if candidates:
+            return candidates
+
+        # Look up the longest (most selective) token by prefix or nickname,
+        # then keep the members that also match every other token
+        ordered = sorted(query_tokens, key=len, reverse=True)
+        lead = ordered[0]
+        cap = MAX_PREFIX_MATCHES if len(ordered) > 1 else MAX_CANDIDATES
+        ids = self._prefix_matches(self._tokens, lead, cap)
+        for nickname in NICKNAMES.get(lead, ()):
+            ids.extend(self._prefix_matches(self._tokens, nickname, cap))
+        candidates = []
+        for user_id in dict.fromkeys(ids):
+            if all(self._has_token(user_id, token) for token in ordered[1:]):
+                candidates.append(user_id)
+                if len(candidates) >= MAX_CANDIDATES:
+                    break
+        if candidates:
+            return candidates
+
+        # Fall back to shared trigrams for misspellings
+        counts = Counter()
+        for token in query_tokens:
+            for gram in trigrams(token):
+                posting = self._trigrams.get(gram, ())
+                if len(posting) <= MAX_TRIGRAM_POSTING:
+                    counts.update(posting)
+        return [user_id for user_id, _ in counts.most_common(MAX_FUZZY_CANDIDATES)]
+
+    def _score(self, query, query_tokens, user_id):
+        best = 0.0
+        for weight, value, tokens in self._fields[user_id]:
+            if value == query:
+                return weight
+            matched = [max(_token_score(q, t) for t in tokens) for q in query_tokens]
+            score = sum(matched) / len(matched)
+            # Prefer names with fewer unmatched parts ("alex" -> "alex" over "alex king")
+            coverage = min(1.0, len(query_tokens) / len(tokens))
+            best = max(best, weight * score * (0.9 + 0.1 * coverage))
+        return round(best, 4)
+
+def _remove_sorted(entries, entry):
+    i = bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
+@lru_cache(maxsize=65536)
+def _token_score(query_token, token):
+    if query_token == token:
+        return 1.0
+    if token in NICKNAMES.get(query_token, ()):
+        return 0.9
+    if token.startswith(query_token):
+        return 0.6 + 0.3 * len(query_token) / len(token)
+    # Too short or too different in length to be a misspelling
+    if len(query_token) < 3 or abs(len(query_token) - len(token)) > max(len(query_token), len(token)) // 2:
+        return 0.0
+    query_grams, grams = trigrams(query_token), trigrams(token)
+    similarity = len(query_grams & grams) / len(query_grams | grams)
+    return 0.8 * similarity if similarity >= 0.4 else 0.0